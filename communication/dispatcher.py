@@ -0,0 +1,116 @@
+"""
+Background dispatch of email and phone communications
+
+Sending an email or placing a call blocks for hundreds of milliseconds
+to seconds on network I/O. When triggered from a web request or the
+scheduler loop, that latency is charged to the caller. The dispatcher
+decouples them: enqueue_* functions push a job onto an in-process queue
+and return immediately, while a small pool of worker threads drains it,
+sharing the EmailSender's pooled SMTP connection and caches.
+"""
+
+import logging
+import queue
+import threading
+
+from config.settings import Config
+from database.models import Property, Contact, session_scope
+from communication.email_sender import EmailSender
+from communication.phone_caller import PhoneCaller
+
+logger = logging.getLogger(__name__)
+
+class CommunicationDispatcher:
+    """Runs communication jobs on background worker threads"""
+
+    WORKER_COUNT = 4
+
+    # Sentinel telling a worker to shut down
+    _STOP = object()
+
+    def __init__(self, config: Config, email_sender: EmailSender = None, phone_caller: PhoneCaller = None):
+        self.config = config
+        self.email_sender = email_sender or EmailSender(config)
+        self.phone_caller = phone_caller or PhoneCaller(config)
+
+        self._queue: queue.Queue = queue.Queue()
+        self._workers = []
+        for i in range(self.WORKER_COUNT):
+            worker = threading.Thread(
+                target=self._worker_loop, name=f"comm-dispatch-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is self._STOP:
+                self._queue.task_done()
+                break
+            kind, entity_id = job
+            try:
+                self._run_job(kind, entity_id)
+            except Exception:
+                logger.exception("Dispatcher job failed: %s(%s)", kind, entity_id)
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, kind: str, entity_id: int):
+        """Execute one dequeued communication job"""
+        with session_scope() as db:
+            if kind == 'initial_email':
+                property_obj = db.query(Property).get(entity_id)
+                if property_obj:
+                    self.email_sender.send_initial_contact_email(property_obj, db=db)
+            elif kind in ('follow_up_email', 'urgent_email'):
+                contact = db.query(Contact).get(entity_id)
+                if contact:
+                    if kind == 'follow_up_email':
+                        self.email_sender.send_follow_up_email(contact, db=db)
+                    else:
+                        self.email_sender.send_urgent_follow_up_email(contact, db=db)
+            elif kind in ('initial_call', 'follow_up_call'):
+                contact = db.query(Contact).get(entity_id)
+                if contact:
+                    if kind == 'initial_call':
+                        self.phone_caller.make_initial_call(contact)
+                    else:
+                        self.phone_caller.make_follow_up_call(contact)
+            else:
+                logger.warning("Unknown dispatcher job kind: %s", kind)
+
+    # Public enqueue API - IDs are passed instead of ORM objects so jobs
+    # never carry detached instances across threads
+    def enqueue_initial_email(self, property_id: int):
+        """Queue an initial contact email and return immediately"""
+        self._queue.put(('initial_email', property_id))
+
+    def enqueue_follow_up_email(self, contact_id: int):
+        """Queue a follow-up email and return immediately"""
+        self._queue.put(('follow_up_email', contact_id))
+
+    def enqueue_urgent_email(self, contact_id: int):
+        """Queue an urgent final follow-up email and return immediately"""
+        self._queue.put(('urgent_email', contact_id))
+
+    def enqueue_initial_call(self, contact_id: int):
+        """Queue an initial phone call and return immediately"""
+        self._queue.put(('initial_call', contact_id))
+
+    def enqueue_follow_up_call(self, contact_id: int):
+        """Queue a follow-up phone call and return immediately"""
+        self._queue.put(('follow_up_call', contact_id))
+
+    def join(self):
+        """Block until every queued job has been processed"""
+        self._queue.join()
+
+    def stop(self):
+        """Drain the queue and shut the workers down"""
+        self.join()
+        for _ in self._workers:
+            self._queue.put(self._STOP)
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self.phone_caller.flush_log()
+        self.email_sender.close()
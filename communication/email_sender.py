@@ -2,211 +2,33 @@
 Email automation for French Real Estate Rental Hunter
 """
 
+import asyncio
+import base64
+import concurrent.futures
+import html
+import itertools
 import logging
+import queue
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime
-from typing import Optional, Dict, Any
+import textwrap
+import threading
+import time
+from contextlib import contextmanager
+from email import policy
+from email.message import EmailMessage
+from email.utils import formataddr
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple
 
-from jinja2 import Template
+import aiosmtplib
+from sqlalchemy.orm import load_only, Session
 
 from config.settings import Config
-from database.models import Property, Contact, Communication, ContactMethod, get_db
+from database.models import Property, Contact, Communication, ContactMethod, session_scope
 
 logger = logging.getLogger(__name__)
 
-class EmailSender:
-    """Handles automated email communications"""
-    
-    def __init__(self, config: Config):
-        self.config = config
-        
-    def _get_smtp_connection(self):
-        """Create SMTP connection"""
-        try:
-            server = smtplib.SMTP(self.config.SMTP_SERVER, self.config.SMTP_PORT)
-            server.starttls()
-            server.login(self.config.SMTP_USERNAME, self.config.SMTP_PASSWORD)
-            return server
-        except Exception as e:
-            logger.error(f"Failed to connect to SMTP server: {str(e)}")
-            return None
-    
-    def _create_email_message(self, to_email: str, subject: str, body_html: str, body_text: str = None) -> MIMEMultipart:
-        """Create email message"""
-        msg = MIMEMultipart('alternative')
-        msg['From'] = f"{self.config.EMAIL_FROM_NAME} <{self.config.EMAIL_FROM}>"
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        # Add text version if provided
-        if body_text:
-            msg.attach(MIMEText(body_text, 'plain', 'utf-8'))
-        
-        # Add HTML version
-        msg.attach(MIMEText(body_html, 'html', 'utf-8'))
-        
-        return msg
-    
-    def send_initial_contact_email(self, property_obj: Property) -> bool:
-        """Send initial contact email for a property"""
-        try:
-            # Get contact information (this would normally be scraped from the property page)
-            db = get_db()
-            contact = db.query(Contact).filter(Contact.property_id == property_obj.id).first()
-            
-            if not contact or not contact.email:
-                logger.warning(f"No email contact found for property {property_obj.id}")
-                return False
-            
-            # Prepare email content
-            subject = f"Demande de visite - {property_obj.title}"
-            
-            email_template = Template(self._get_initial_contact_template())
-            body_html = email_template.render(
-                property=property_obj,
-                contact=contact,
-                sender_name=self.config.EMAIL_FROM_NAME
-            )
-            
-            # Create and send email
-            msg = self._create_email_message(contact.email, subject, body_html)
-            
-            server = self._get_smtp_connection()
-            if not server:
-                return False
-            
-            server.send_message(msg)
-            server.quit()
-            
-            # Log communication
-            self._log_communication(property_obj, contact, 'email', subject, body_html, 'sent')
-            
-            logger.info(f"✅ Initial contact email sent for property {property_obj.id}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to send initial contact email: {str(e)}")
-            return False
-        finally:
-            if 'db' in locals():
-                db.close()
-    
-    def send_follow_up_email(self, contact: Contact) -> bool:
-        """Send follow-up email"""
-        try:
-            if not contact.email:
-                return False
-            
-            db = get_db()
-            property_obj = db.query(Property).get(contact.property_id)
-            
-            if not property_obj:
-                return False
-            
-            subject = f"Relance - Demande de visite - {property_obj.title}"
-            
-            email_template = Template(self._get_follow_up_template())
-            body_html = email_template.render(
-                property=property_obj,
-                contact=contact,
-                sender_name=self.config.EMAIL_FROM_NAME,
-                attempt_number=contact.contact_attempts + 1
-            )
-            
-            msg = self._create_email_message(contact.email, subject, body_html)
-            
-            server = self._get_smtp_connection()
-            if not server:
-                return False
-            
-            server.send_message(msg)
-            server.quit()
-            
-            # Log communication
-            self._log_communication(property_obj, contact, 'email', subject, body_html, 'sent')
-            
-            logger.info(f"✅ Follow-up email sent to contact {contact.id}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to send follow-up email: {str(e)}")
-            return False
-        finally:
-            if 'db' in locals():
-                db.close()
-    
-    def send_urgent_follow_up_email(self, contact: Contact) -> bool:
-        """Send urgent final follow-up email"""
-        try:
-            if not contact.email:
-                return False
-            
-            db = get_db()
-            property_obj = db.query(Property).get(contact.property_id)
-            
-            if not property_obj:
-                return False
-            
-            subject = f"URGENT - Dernière relance - {property_obj.title}"
-            
-            email_template = Template(self._get_urgent_follow_up_template())
-            body_html = email_template.render(
-                property=property_obj,
-                contact=contact,
-                sender_name=self.config.EMAIL_FROM_NAME
-            )
-            
-            msg = self._create_email_message(contact.email, subject, body_html)
-            
-            server = self._get_smtp_connection()
-            if not server:
-                return False
-            
-            server.send_message(msg)
-            server.quit()
-            
-            # Log communication
-            self._log_communication(property_obj, contact, 'email', subject, body_html, 'sent')
-            
-            logger.info(f"✅ Urgent follow-up email sent to contact {contact.id}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to send urgent follow-up email: {str(e)}")
-            return False
-        finally:
-            if 'db' in locals():
-                db.close()
-    
-    def _log_communication(self, property_obj: Property, contact: Contact, method: str, subject: str, message: str, status: str):
-        """Log communication in database"""
-        try:
-            db = get_db()
-            
-            communication = Communication(
-                property_id=property_obj.id,
-                contact_id=contact.id,
-                method=ContactMethod.EMAIL,
-                subject=subject,
-                message=message,
-                status=status,
-                sent_at=datetime.utcnow()
-            )
-            
-            db.add(communication)
-            db.commit()
-            
-        except Exception as e:
-            logger.error(f"Error logging communication: {str(e)}")
-        finally:
-            if 'db' in locals():
-                db.close()
-    
-    def _get_initial_contact_template(self) -> str:
-        """Get initial contact email template"""
-        return """
+_INITIAL_TPL = textwrap.dedent("""
         <!DOCTYPE html>
         <html>
         <head>
@@ -215,19 +37,19 @@ class EmailSender:
         </head>
         <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
             <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #2c3e50;">Demande de visite - {{ property.title }}</h2>
+                <h2 style="color: #2c3e50;">Demande de visite - {title}</h2>
                 
-                <p>Bonjour{% if contact.name %} {{ contact.name }}{% endif %},</p>
+                <p>Bonjour{name_clause},</p>
                 
                 <p>Je me permets de vous contacter concernant le bien immobilier suivant :</p>
                 
                 <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                    <h3 style="margin-top: 0; color: #495057;">{{ property.title }}</h3>
-                    <p><strong>Prix :</strong> {{ property.price }} €/mois</p>
-                    <p><strong>Ville :</strong> {{ property.city }}</p>
-                    {% if property.rooms %}<p><strong>Pièces :</strong> {{ property.rooms }}</p>{% endif %}
-                    {% if property.area %}<p><strong>Surface :</strong> {{ property.area }} m²</p>{% endif %}
-                    <p><strong>Lien :</strong> <a href="{{ property.source_url }}">Voir l'annonce</a></p>
+                    <h3 style="margin-top: 0; color: #495057;">{title}</h3>
+                    <p><strong>Prix :</strong> {price} €/mois</p>
+                    <p><strong>Ville :</strong> {city}</p>
+                    {rooms_clause}
+                    {area_clause}
+                    <p><strong>Lien :</strong> <a href="{source_url}">Voir l'annonce</a></p>
                 </div>
                 
                 <p>Je suis très intéressé(e) par ce bien et souhaiterais organiser une visite dans les plus brefs délais.</p>
@@ -240,7 +62,7 @@ class EmailSender:
                 
                 <p style="margin-top: 30px;">
                     Cordialement,<br>
-                    <strong>{{ sender_name }}</strong>
+                    <strong>{sender_name}</strong>
                 </p>
                 
                 <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; font-size: 12px; color: #666;">
@@ -249,11 +71,9 @@ class EmailSender:
             </div>
         </body>
         </html>
-        """
-    
-    def _get_follow_up_template(self) -> str:
-        """Get follow-up email template"""
-        return """
+        """)
+
+_FOLLOW_UP_TPL = textwrap.dedent("""
         <!DOCTYPE html>
         <html>
         <head>
@@ -264,15 +84,15 @@ class EmailSender:
             <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
                 <h2 style="color: #e74c3c;">Relance - Demande de visite</h2>
                 
-                <p>Bonjour{% if contact.name %} {{ contact.name }}{% endif %},</p>
+                <p>Bonjour{name_clause},</p>
                 
                 <p>Je vous avais contacté(e) récemment concernant le bien immobilier suivant :</p>
                 
                 <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                    <h3 style="margin-top: 0; color: #495057;">{{ property.title }}</h3>
-                    <p><strong>Prix :</strong> {{ property.price }} €/mois</p>
-                    <p><strong>Ville :</strong> {{ property.city }}</p>
-                    <p><strong>Lien :</strong> <a href="{{ property.source_url }}">Voir l'annonce</a></p>
+                    <h3 style="margin-top: 0; color: #495057;">{title}</h3>
+                    <p><strong>Prix :</strong> {price} €/mois</p>
+                    <p><strong>Ville :</strong> {city}</p>
+                    <p><strong>Lien :</strong> <a href="{source_url}">Voir l'annonce</a></p>
                 </div>
                 
                 <p>N'ayant pas eu de retour de votre part, je me permets de vous relancer car ce bien correspond parfaitement à mes critères de recherche.</p>
@@ -285,20 +105,18 @@ class EmailSender:
                 
                 <p style="margin-top: 30px;">
                     Cordialement,<br>
-                    <strong>{{ sender_name }}</strong>
+                    <strong>{sender_name}</strong>
                 </p>
                 
                 <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; font-size: 12px; color: #666;">
-                    <p>Relance automatique n°{{ attempt_number }} - Système de recherche immobilière</p>
+                    <p>Relance automatique n°{attempt_number} - Système de recherche immobilière</p>
                 </div>
             </div>
         </body>
         </html>
-        """
-    
-    def _get_urgent_follow_up_template(self) -> str:
-        """Get urgent follow-up email template"""
-        return """
+        """)
+
+_URGENT_TPL = textwrap.dedent("""
         <!DOCTYPE html>
         <html>
         <head>
@@ -309,15 +127,15 @@ class EmailSender:
             <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
                 <h2 style="color: #c0392b; text-transform: uppercase;">🚨 URGENT - Dernière relance</h2>
                 
-                <p>Bonjour{% if contact.name %} {{ contact.name }}{% endif %},</p>
+                <p>Bonjour{name_clause},</p>
                 
                 <p><strong style="color: #e74c3c;">Il s'agit de ma dernière relance concernant ce bien.</strong></p>
                 
                 <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #e74c3c;">
-                    <h3 style="margin-top: 0; color: #495057;">{{ property.title }}</h3>
-                    <p><strong>Prix :</strong> {{ property.price }} €/mois</p>
-                    <p><strong>Ville :</strong> {{ property.city }}</p>
-                    <p><strong>Lien :</strong> <a href="{{ property.source_url }}">Voir l'annonce</a></p>
+                    <h3 style="margin-top: 0; color: #495057;">{title}</h3>
+                    <p><strong>Prix :</strong> {price} €/mois</p>
+                    <p><strong>Ville :</strong> {city}</p>
+                    <p><strong>Lien :</strong> <a href="{source_url}">Voir l'annonce</a></p>
                 </div>
                 
                 <p>Je vous ai contacté(e) à plusieurs reprises sans obtenir de réponse. Je comprends que vous puissiez être occupé(e), mais j'aimerais connaître le statut de ce bien :</p>
@@ -339,7 +157,7 @@ class EmailSender:
                 
                 <p style="margin-top: 30px;">
                     Cordialement,<br>
-                    <strong>{{ sender_name }}</strong>
+                    <strong>{sender_name}</strong>
                 </p>
                 
                 <div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; font-size: 12px; color: #666;">
@@ -348,4 +166,783 @@ class EmailSender:
             </div>
         </body>
         </html>
-        """
\ No newline at end of file
+        """)
+
+# Bound str.format methods - subject dispatch is a single C-level call
+# in the send loop instead of building a fresh f-string each time
+SUBJECT_INITIAL = "Demande de visite - {title}".format
+SUBJECT_FOLLOW_UP = "Relance - Demande de visite - {title}".format
+SUBJECT_URGENT = "URGENT - Dernière relance - {title}".format
+
+_TEMPLATES_BY_KIND = {
+    'initial': _INITIAL_TPL,
+    'follow_up': _FOLLOW_UP_TPL,
+    'urgent': _URGENT_TPL,
+}
+
+def render_logged_body(template_name: str, context: Dict[str, Any]) -> str:
+    """Rebuild the HTML body of a logged communication on demand
+
+    Communication rows store only the template name and rendering
+    context; this re-applies the template when the full body is needed
+    (e.g. for an audit view).
+    """
+    template = _TEMPLATES_BY_KIND.get(template_name)
+    if template is None:
+        return ''
+    return template.format_map(context or {})
+
+class _PipeliningMixin:
+    """RFC 2920 PIPELINING support for smtplib connections
+
+    Stock smtplib waits for a reply after each of MAIL FROM, RCPT TO and
+    DATA, costing two extra round-trips per message. When the server
+    advertises PIPELINING, this mixin streams the whole envelope in one
+    burst and reads the deferred replies afterwards. send_message() picks
+    this up automatically since it delegates to sendmail().
+    """
+
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=(), rcpt_options=()):
+        self.ehlo_or_helo_if_needed()
+        if not self.has_extn('pipelining'):
+            return super().sendmail(from_addr, to_addrs, msg, mail_options, rcpt_options)
+
+        if isinstance(msg, str):
+            msg = smtplib._fix_eols(msg).encode('ascii')
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+
+        esmtp_opts = []
+        if self.does_esmtp and 'size' in self.esmtp_features:
+            esmtp_opts.append("size=%d" % len(msg))
+        esmtp_opts.extend(mail_options)
+
+        # Stream MAIL/RCPT/DATA without waiting between commands
+        self.putcmd("mail", "FROM:%s%s" % (
+            smtplib.quoteaddr(from_addr), ''.join(' ' + o for o in esmtp_opts)))
+        for addr in to_addrs:
+            self.putcmd("rcpt", "TO:%s%s" % (
+                smtplib.quoteaddr(addr), ''.join(' ' + o for o in rcpt_options)))
+        self.putcmd("data")
+
+        # Collect the deferred replies in command order
+        (mail_code, mail_resp) = self.getreply()
+        senderrs = {}
+        for addr in to_addrs:
+            (code, resp) = self.getreply()
+            if code not in (250, 251):
+                senderrs[addr] = (code, resp)
+        (data_code, data_resp) = self.getreply()
+
+        if mail_code != 250 or len(senderrs) == len(to_addrs):
+            if data_code == 354:
+                # Terminate the opened DATA phase with an empty body
+                self.send(b'.\r\n')
+                self.getreply()
+            if mail_code == 421:
+                self.close()
+            else:
+                self._rset()
+            if mail_code != 250:
+                raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+            raise smtplib.SMTPRecipientsRefused(senderrs)
+
+        if data_code != 354:
+            if data_code == 421:
+                self.close()
+            raise smtplib.SMTPDataError(data_code, data_resp)
+
+        q = smtplib._quote_periods(msg)
+        if q[-2:] != smtplib.bCRLF:
+            q = q + smtplib.bCRLF
+        q = q + b'.' + smtplib.bCRLF
+        self.send(q)
+        (code, resp) = self.getreply()
+        if code != 250:
+            if code == 421:
+                self.close()
+            raise smtplib.SMTPDataError(code, resp)
+        return senderrs
+
+class _PipeliningSMTP(_PipeliningMixin, smtplib.SMTP):
+    pass
+
+class _PipeliningSMTP_SSL(_PipeliningMixin, smtplib.SMTP_SSL):
+    pass
+
+class EmailSender:
+    """Handles automated email communications"""
+
+    # Rotate the SMTP connection to respect server-side session limits
+    SMTP_MAX_MESSAGES = 1000
+    SMTP_MAX_AGE_SECONDS = 600  # 10 minutes
+
+    # Bound for the per-instance Contact/Property lookup caches
+    CACHE_MAX_ENTRIES = 4096
+
+    # Batching limits for the background log writer
+    LOG_BATCH_SIZE = 100
+    LOG_BATCH_WAIT_SECONDS = 1.0
+
+    # Sentinel telling the log worker to shut down
+    _LOG_STOP = object()
+
+    def __init__(self, config: Config):
+        self.config = config
+        self._policy = policy.SMTP
+
+        # From header is immutable per sender - compute it once, with
+        # proper RFC encoding for non-ASCII display names
+        self._from_header = formataddr((config.EMAIL_FROM_NAME, config.EMAIL_FROM))
+
+        # Byte skeleton shared by every message on the sync send paths -
+        # only To, Subject and the body vary per email
+        self._raw_header_skeleton = (
+            f"From: {self._from_header}\r\n"
+            "MIME-Version: 1.0\r\n"
+            'Content-Type: text/html; charset="utf-8"\r\n'
+            "Content-Transfer-Encoding: base64\r\n"
+        ).encode('ascii')
+
+        # Persistent SMTP connection, reused across sends; the lock keeps
+        # acquire/teardown safe when sends run from worker threads
+        self._smtp = None
+        self._smtp_msg_count = 0
+        self._smtp_opened_at = 0.0
+        self._conn_lock = threading.Lock()
+
+        # Point-lookup caches keyed by property id - the same properties and
+        # contacts recur across initial/follow-up/urgent stages
+        self._property_cache: Dict[int, Property] = {}
+        self._contact_cache: Dict[int, Contact] = {}
+
+        # Communication logging runs in a background thread so the SMTP
+        # path never blocks on DB commits
+        self._log_q: queue.Queue = queue.Queue()
+        self._log_thread = threading.Thread(target=self._log_worker, daemon=True)
+        self._log_thread.start()
+
+    def _connect_smtp(self):
+        """Open and authenticate a new SMTP connection"""
+        if self.config.SMTP_USE_SSL:
+            # TLS is negotiated with the TCP handshake - no STARTTLS dance
+            server = _PipeliningSMTP_SSL(self.config.SMTP_SERVER, self.config.SMTP_PORT)
+        else:
+            server = _PipeliningSMTP(self.config.SMTP_SERVER, self.config.SMTP_PORT)
+            server.starttls()
+        server.login(self.config.SMTP_USERNAME, self.config.SMTP_PASSWORD)
+        return server
+
+    def _acquire_smtp(self):
+        """Get the cached SMTP connection, reconnecting if it went stale"""
+        with self._conn_lock:
+            return self._acquire_smtp_locked()
+
+    def _acquire_smtp_locked(self):
+        try:
+            if self._smtp is not None:
+                # Rotate aged or heavily used connections
+                too_old = time.monotonic() - self._smtp_opened_at > self.SMTP_MAX_AGE_SECONDS
+                too_used = self._smtp_msg_count >= self.SMTP_MAX_MESSAGES
+                if too_old or too_used:
+                    self._close_smtp()
+                elif self._smtp.noop()[0] == 250:
+                    return self._smtp
+                else:
+                    self._close_smtp()
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPException, OSError):
+            self._close_smtp()
+
+        try:
+            self._smtp = self._connect_smtp()
+            self._smtp_msg_count = 0
+            self._smtp_opened_at = time.monotonic()
+            return self._smtp
+        except Exception:
+            logger.exception("Failed to connect to SMTP server")
+            self._smtp = None
+            return None
+
+    def _send_over_shared(self, to_email: str, raw: bytes) -> bool:
+        """Send one message over the shared connection, atomically
+
+        The lock spans acquisition and the sendmail dialog - dispatcher
+        worker threads share this sender, and interleaved envelopes on
+        one socket corrupt the SMTP conversation.
+        """
+        with self._conn_lock:
+            server = self._acquire_smtp_locked()
+            if not server:
+                return False
+            server.sendmail(self.config.EMAIL_FROM, [to_email], raw)
+            self._smtp_msg_count += 1
+            return True
+
+    def _close_smtp(self):
+        """Quit the cached SMTP connection, ignoring errors"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+            self._smtp_msg_count = 0
+
+    def close(self):
+        """Release the persistent SMTP connection and drain pending logs
+
+        The stop sentinel queues behind any pending records, so the
+        worker drains them before exiting; the bounded join keeps close
+        safe from __del__ at interpreter shutdown, where an unbounded
+        wait on a dead worker would hang forever.
+        """
+        if self._log_thread.is_alive():
+            self._log_q.put(self._LOG_STOP)
+            self._log_thread.join(timeout=5)
+        with self._conn_lock:
+            self._close_smtp()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        self.close()
+
+    def _get_property_cached(self, db, property_id: int) -> Optional[Property]:
+        """Fetch a Property by id, reusing previously loaded rows"""
+        property_obj = self._property_cache.get(property_id)
+        if property_obj is None:
+            property_obj = db.query(Property).get(property_id)
+            if property_obj is not None:
+                if len(self._property_cache) >= self.CACHE_MAX_ENTRIES:
+                    self._property_cache.clear()
+                self._property_cache[property_id] = property_obj
+        return property_obj
+
+    def _get_contact_cached(self, db, property_id: int) -> Optional[Contact]:
+        """Fetch the Contact for a property, reusing previously loaded rows"""
+        contact = self._contact_cache.get(property_id)
+        if contact is None:
+            # Reject contacts without an email address in SQL so rows that
+            # could never be mailed are not even materialized
+            contact = db.query(Contact).options(
+                load_only(
+                    Contact.id, Contact.name, Contact.email,
+                    Contact.property_id, Contact.contact_attempts
+                )
+            ).filter(
+                Contact.property_id == property_id,
+                Contact.email.isnot(None),
+                Contact.email != ''
+            ).first()
+            if contact is not None:
+                if len(self._contact_cache) >= self.CACHE_MAX_ENTRIES:
+                    self._contact_cache.clear()
+                self._contact_cache[property_id] = contact
+        return contact
+
+    def clear_caches(self):
+        """Drop cached Contact/Property lookups (e.g. between batches)"""
+        self._property_cache.clear()
+        self._contact_cache.clear()
+
+    @contextmanager
+    def _session_or(self, db: Optional[Session]):
+        """Reuse a caller-provided session, or open a scoped one
+
+        Lets callers driving several sends (scheduler loops, batch jobs)
+        pay a single pool checkout instead of one per email.
+        """
+        if db is not None:
+            yield db
+        else:
+            with session_scope() as scoped:
+                yield scoped
+
+    @staticmethod
+    def _encode_header(value: str) -> bytes:
+        """Encode a header value, RFC 2047-wrapping non-ASCII text"""
+        try:
+            return value.encode('ascii')
+        except UnicodeEncodeError:
+            return b'=?utf-8?b?' + base64.b64encode(value.encode('utf-8')) + b'?='
+
+    def _serialize_message(self, to_email: str, subject: str, body_html: str) -> bytes:
+        """Build the raw message bytes around the precomputed skeleton
+
+        Skips the EmailMessage tree and its per-send policy/serialization
+        pass: the constant headers are baked once in __init__ and the
+        result goes straight to SMTP sendmail().
+        """
+        payload = base64.b64encode(body_html.encode('utf-8'))
+        body_lines = [payload[i:i + 76] for i in range(0, len(payload), 76)]
+        return b''.join([
+            self._raw_header_skeleton,
+            b'To: ', to_email.encode('ascii'), b'\r\n',
+            b'Subject: ', self._encode_header(subject), b'\r\n',
+            b'\r\n',
+            b'\r\n'.join(body_lines), b'\r\n'
+        ])
+
+    def _create_email_message(self, to_email: str, subject: str, body_html: str, body_text: str = None) -> EmailMessage:
+        """Create email message"""
+        msg = EmailMessage(policy=self._policy)
+        msg['From'] = self._from_header
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        # HTML-only unless a text version is provided
+        if body_text:
+            msg.set_content(body_text, subtype='plain', charset='utf-8')
+            msg.add_alternative(body_html, subtype='html', charset='utf-8')
+        else:
+            msg.set_content(body_html, subtype='html', charset='utf-8')
+        
+        return msg
+    
+    def send_initial_contact_email(self, property_obj: Property, contact: Contact = None, db: Optional[Session] = None) -> bool:
+        """Send initial contact email for a property
+
+        Callers that already hold the Contact can pass it in; the
+        database is then never touched on this path.
+        """
+        try:
+            # Get contact information (this would normally be scraped from
+            # the property page) - only open a session when it is missing
+            if contact is None:
+                contact = self._contact_cache.get(property_obj.id)
+            if contact is None:
+                with self._session_or(db) as db:
+                    contact = self._get_contact_cached(db, property_obj.id)
+
+            if not contact or not contact.email:
+                logger.warning("No email contact found for property %s", property_obj.id)
+                return False
+
+            # Prepare email content
+            subject, body_html, tpl_ctx = self._render_email(property_obj, contact, 'initial')
+
+            # Create and send email
+            raw = self._serialize_message(contact.email, subject, body_html)
+
+            if not self._send_over_shared(contact.email, raw):
+                return False
+
+            # Log communication
+            self._log_communication(property_obj, contact, 'email', subject, 'initial', tpl_ctx, 'sent')
+
+            logger.info("✅ Initial contact email sent for property %s", property_obj.id)
+            return True
+
+        except Exception:
+            logger.exception("❌ Failed to send initial contact email")
+            return False
+    
+    def send_follow_up_email(self, contact: Contact, db: Optional[Session] = None) -> bool:
+        """Send follow-up email"""
+        try:
+            with self._session_or(db) as db:
+                if not contact.email:
+                    return False
+            
+                property_obj = self._get_property_cached(db, contact.property_id)
+            
+                if not property_obj:
+                    return False
+            
+                subject, body_html, tpl_ctx = self._render_email(property_obj, contact, 'follow_up')
+            
+                raw = self._serialize_message(contact.email, subject, body_html)
+            
+                if not self._send_over_shared(contact.email, raw):
+                    return False
+            
+                # Log communication
+                self._log_communication(property_obj, contact, 'email', subject, 'follow_up', tpl_ctx, 'sent')
+            
+                logger.info("✅ Follow-up email sent to contact %s", contact.id)
+                return True
+            
+        except Exception:
+            logger.exception("❌ Failed to send follow-up email")
+            return False
+    
+    def send_urgent_follow_up_email(self, contact: Contact, db: Optional[Session] = None) -> bool:
+        """Send urgent final follow-up email"""
+        try:
+            with self._session_or(db) as db:
+                if not contact.email:
+                    return False
+            
+                property_obj = self._get_property_cached(db, contact.property_id)
+            
+                if not property_obj:
+                    return False
+            
+                subject, body_html, tpl_ctx = self._render_email(property_obj, contact, 'urgent')
+            
+                raw = self._serialize_message(contact.email, subject, body_html)
+            
+                if not self._send_over_shared(contact.email, raw):
+                    return False
+            
+                # Log communication
+                self._log_communication(property_obj, contact, 'email', subject, 'urgent', tpl_ctx, 'sent')
+            
+                logger.info("✅ Urgent follow-up email sent to contact %s", contact.id)
+                return True
+            
+        except Exception:
+            logger.exception("❌ Failed to send urgent follow-up email")
+            return False
+    
+    def _render_email(self, property_obj: Property, contact: Contact, kind: str) -> Tuple[str, str, Dict[str, Any]]:
+        """Render subject, HTML body and template context for an email kind
+
+        Rendering is a single str.format_map call on a pre-built template;
+        untrusted text fields are escaped with html.escape. The returned
+        context is what gets logged instead of the full body - the body
+        can be rebuilt from it with render_logged_body().
+        """
+        fields = {
+            'title': html.escape(str(property_obj.title or '')),
+            'price': html.escape(str(property_obj.price or '')),
+            'city': html.escape(str(property_obj.city or '')),
+            'source_url': html.escape(str(property_obj.source_url or '')),
+            'sender_name': html.escape(str(self.config.EMAIL_FROM_NAME or '')),
+            'name_clause': f" {html.escape(contact.name)}" if contact.name else '',
+        }
+
+        if kind == 'initial':
+            fields['rooms_clause'] = (
+                f"<p><strong>Pièces :</strong> {property_obj.rooms}</p>"
+                if property_obj.rooms else ''
+            )
+            fields['area_clause'] = (
+                f"<p><strong>Surface :</strong> {property_obj.area} m²</p>"
+                if property_obj.area else ''
+            )
+            subject = SUBJECT_INITIAL(title=property_obj.title)
+            body_html = _INITIAL_TPL.format_map(fields)
+        elif kind == 'follow_up':
+            fields['attempt_number'] = contact.contact_attempts + 1
+            subject = SUBJECT_FOLLOW_UP(title=property_obj.title)
+            body_html = _FOLLOW_UP_TPL.format_map(fields)
+        elif kind == 'urgent':
+            subject = SUBJECT_URGENT(title=property_obj.title)
+            body_html = _URGENT_TPL.format_map(fields)
+        else:
+            raise ValueError(f"Unknown email kind: {kind}")
+
+        return subject, body_html, fields
+
+    def _prepare_batch(self, items: List[Tuple[Property, Contact, str]]) -> List[tuple]:
+        """Render and build all messages for a batch before touching the network"""
+        prepared = []
+        for property_obj, contact, kind in items:
+            if not contact or not contact.email:
+                continue
+            try:
+                subject, body_html, tpl_ctx = self._render_email(property_obj, contact, kind)
+                raw = self._serialize_message(contact.email, subject, body_html)
+                prepared.append((property_obj, contact, subject, kind, tpl_ctx, raw))
+            except Exception:
+                logger.exception("Error preparing email for contact %s", contact.id)
+        return prepared
+
+    def send_batch_concurrent(self, items: List[Tuple[Property, Contact, str]], max_workers: int = None) -> int:
+        """Send a batch of emails across a pool of worker threads
+
+        Each worker draws a pre-authenticated SMTP connection from a shared
+        pool, so up to SMTP_POOL_SIZE dialogs run in parallel while every
+        connection is still reused across messages. Items follow the same
+        (property, contact, kind) shape as send_batch.
+        """
+        if not items:
+            return 0
+
+        prepared = self._prepare_batch(items)
+        if not prepared:
+            return 0
+
+        max_workers = max_workers or self.config.SMTP_POOL_SIZE
+        pool: queue.Queue = queue.Queue()
+        for _ in range(min(max_workers, len(prepared))):
+            try:
+                pool.put(self._connect_smtp())
+            except Exception:
+                logger.exception("Failed to open pooled SMTP connection")
+        if pool.empty():
+            return 0
+
+        def _send_one(entry):
+            property_obj, contact, subject, kind, tpl_ctx, raw = entry
+            conn = pool.get()
+            try:
+                try:
+                    conn.sendmail(self.config.EMAIL_FROM, [contact.email], raw)
+                except smtplib.SMTPServerDisconnected:
+                    conn = self._connect_smtp()
+                    conn.sendmail(self.config.EMAIL_FROM, [contact.email], raw)
+                self._log_communication(property_obj, contact, 'email', subject, kind, tpl_ctx, 'sent')
+                return True
+            except Exception:
+                logger.exception("Error sending pooled email to %s", contact.email)
+                return False
+            finally:
+                pool.put(conn)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=pool.qsize()) as executor:
+            results = list(executor.map(_send_one, prepared))
+
+        # Tear the pooled connections down
+        while True:
+            try:
+                conn = pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.quit()
+            except Exception:
+                pass
+
+        self.flush_communications()
+        sent = sum(results)
+        logger.info("✅ Concurrent batch send completed: %d/%d emails sent", sent, len(items))
+        return sent
+
+    def send_batch(self, items: List[Tuple[Property, Contact, str]]) -> int:
+        """Send a batch of emails over a single SMTP session
+
+        Each item is a (property, contact, kind) tuple where kind is one of
+        'initial', 'follow_up' or 'urgent'. All templates are rendered
+        upfront, the session is reused with RSET between messages, and all
+        communications are logged in one DB transaction.
+        """
+        if not items:
+            return 0
+
+        prepared = self._prepare_batch(items)
+        if not prepared:
+            return 0
+
+        sent = []
+        # The shared connection is held for the whole session so another
+        # thread cannot inject commands between this batch's envelopes
+        with self._conn_lock:
+            server = self._acquire_smtp_locked()
+            if not server:
+                return 0
+
+            if 'pipelining' in server.esmtp_features:
+                logger.debug("SMTP server supports PIPELINING - envelope commands are streamed per message")
+
+            for i, (property_obj, contact, subject, kind, tpl_ctx, raw) in enumerate(prepared):
+                try:
+                    server.sendmail(self.config.EMAIL_FROM, [contact.email], raw)
+                    self._smtp_msg_count += 1
+                    sent.append((property_obj, contact, subject, kind, tpl_ctx))
+
+                    # Reset the envelope so the session can be reused
+                    if i < len(prepared) - 1:
+                        server.rset()
+                except smtplib.SMTPServerDisconnected:
+                    logger.warning("SMTP server disconnected mid-batch - reconnecting")
+                    server = self._acquire_smtp_locked()
+                    if not server:
+                        break
+                except Exception:
+                    logger.exception("Error sending batch email to %s", contact.email)
+
+        # Log all sent communications in a single transaction
+        for property_obj, contact, subject, kind, tpl_ctx in sent:
+            self._log_communication(property_obj, contact, 'email', subject, kind, tpl_ctx, 'sent')
+        self.flush_communications()
+
+        logger.info("✅ Batch send completed: %d/%d emails sent", len(sent), len(items))
+        return len(sent)
+
+    async def _send_message_async(self, msg) -> bool:
+        """Send one message over a fresh async SMTP dialog"""
+        smtp = aiosmtplib.SMTP(
+            hostname=self.config.SMTP_SERVER,
+            port=self.config.SMTP_PORT,
+            use_tls=self.config.SMTP_USE_SSL
+        )
+        try:
+            # connect() upgrades to STARTTLS by itself when the server
+            # advertises it; an explicit starttls() on top raises
+            # "Connection already using TLS"
+            await smtp.connect()
+            await smtp.login(self.config.SMTP_USERNAME, self.config.SMTP_PASSWORD)
+            await smtp.send_message(msg)
+            return True
+        finally:
+            try:
+                await smtp.quit()
+            except Exception:
+                pass
+
+    async def send_initial_contact_email_async(self, property_obj: Property) -> bool:
+        """Async variant of send_initial_contact_email"""
+        try:
+            with session_scope() as db:
+                contact = self._get_contact_cached(db, property_obj.id)
+
+                if not contact or not contact.email:
+                    logger.warning("No email contact found for property %s", property_obj.id)
+                    return False
+
+                subject, body_html, tpl_ctx = self._render_email(property_obj, contact, 'initial')
+                msg = self._create_email_message(contact.email, subject, body_html)
+
+                await self._send_message_async(msg)
+
+                self._log_communication(property_obj, contact, 'email', subject, 'initial', tpl_ctx, 'sent')
+                logger.info("✅ Initial contact email sent for property %s", property_obj.id)
+                return True
+        except Exception:
+            logger.exception("❌ Failed to send initial contact email")
+            return False
+
+    async def send_follow_up_email_async(self, contact: Contact) -> bool:
+        """Async variant of send_follow_up_email"""
+        return await self._send_follow_up_async(contact, 'follow_up')
+
+    async def send_urgent_follow_up_email_async(self, contact: Contact) -> bool:
+        """Async variant of send_urgent_follow_up_email"""
+        return await self._send_follow_up_async(contact, 'urgent')
+
+    async def _send_follow_up_async(self, contact: Contact, kind: str) -> bool:
+        """Shared async path for follow-up and urgent follow-up emails"""
+        try:
+            with session_scope() as db:
+                if not contact.email:
+                    return False
+
+                property_obj = self._get_property_cached(db, contact.property_id)
+
+                if not property_obj:
+                    return False
+
+                subject, body_html, tpl_ctx = self._render_email(property_obj, contact, kind)
+                msg = self._create_email_message(contact.email, subject, body_html)
+
+                await self._send_message_async(msg)
+
+                self._log_communication(property_obj, contact, 'email', subject, kind, tpl_ctx, 'sent')
+                logger.info("✅ %s email sent to contact %s", kind, contact.id)
+                return True
+        except Exception:
+            logger.exception("❌ Failed to send %s email", kind)
+            return False
+
+    async def send_many(self, items: List[Tuple[Property, Contact, str]], concurrency: int = 8) -> int:
+        """Send emails concurrently, spreading load across recipient domains
+
+        Tasks are interleaved by recipient mail domain so concurrent dialogs
+        target distinct servers, bounded by an asyncio.Semaphore.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _send_one(property_obj: Property, contact: Contact, kind: str) -> bool:
+            async with semaphore:
+                if kind == 'initial':
+                    return await self.send_initial_contact_email_async(property_obj)
+                return await self._send_follow_up_async(contact, kind)
+
+        # Group by recipient domain, then round-robin across the groups
+        by_domain: Dict[str, list] = {}
+        for property_obj, contact, kind in items:
+            if not contact or not contact.email:
+                continue
+            domain = contact.email.split('@')[-1].lower()
+            by_domain.setdefault(domain, []).append((property_obj, contact, kind))
+
+        interleaved = [
+            item
+            for group in itertools.zip_longest(*by_domain.values())
+            for item in group
+            if item is not None
+        ]
+
+        results = await asyncio.gather(
+            *(_send_one(*item) for item in interleaved),
+            return_exceptions=True
+        )
+
+        sent = sum(1 for r in results if r is True)
+        logger.info("✅ Concurrent send completed: %d/%d emails sent", sent, len(interleaved))
+        return sent
+
+    def _log_communication(self, property_obj: Property, contact: Contact, method: str, subject: str, template_name: str, context: Dict[str, Any], status: str):
+        """Queue a communication record for the background log writer
+
+        Only the template name and rendering context are stored - a few
+        hundred bytes instead of the 2-4 KB rendered HTML body.
+        """
+        self._log_q.put((property_obj.id, contact.id, subject, template_name, context, status, datetime.now(timezone.utc)))
+
+    def flush_communications(self):
+        """Block until all queued communication records have been written"""
+        self._log_q.join()
+
+    def _log_worker(self):
+        """Consume queued communication records and write them in batches"""
+        while True:
+            item = self._log_q.get()
+            if item is self._LOG_STOP:
+                self._log_q.task_done()
+                return
+
+            # Gather more items until the batch is full or the wait expires
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.LOG_BATCH_WAIT_SECONDS
+            while len(batch) < self.LOG_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._log_q.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is self._LOG_STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write_log_batch(batch)
+            for _ in batch:
+                self._log_q.task_done()
+            if stop:
+                self._log_q.task_done()
+                return
+
+    def _write_log_batch(self, batch: List[tuple]):
+        """Persist one batch of communication records in a single transaction
+
+        Goes through the Core executemany path - no ORM instances, no
+        identity-map bookkeeping, just one multi-row INSERT.
+        """
+        try:
+            with session_scope() as db:
+                db.execute(Communication.__table__.insert(), [
+                    {
+                        'property_id': property_id,
+                        'contact_id': contact_id,
+                        'method': ContactMethod.EMAIL,
+                        'subject': subject,
+                        'template_name': template_name,
+                        'context': context,
+                        'status': status,
+                        'sent_at': sent_at
+                    }
+                    for property_id, contact_id, subject, template_name, context, status, sent_at in batch
+                ])
+        except Exception:
+            logger.exception("Error writing communication log batch")
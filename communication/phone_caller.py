@@ -2,24 +2,86 @@
 Phone calling automation for French Real Estate Rental Hunter
 """
 
+import asyncio
 import logging
+import textwrap
+import threading
 from datetime import datetime
+from functools import lru_cache
+from string import Template
 from typing import Optional, Dict, Any
 
+import httpx
+from requests.adapters import HTTPAdapter
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioException
+from urllib3.util.retry import Retry
 
 from config.settings import Config
-from database.models import Property, Contact, Communication, ContactMethod, get_db
+from database.models import Property, Contact, Communication, ContactMethod, session_scope
 
 logger = logging.getLogger(__name__)
 
+# TwiML scripts are static apart from the location and price, so they are
+# baked as module-level templates, stripped once at definition time
+_FOLLOW_UP_CALL_TPL = Template(textwrap.dedent("""\
+    <?xml version="1.0" encoding="UTF-8"?>
+    <Response>
+        <Pause length="1"/>
+        <Say voice="alice" language="fr-FR">
+            Bonjour, je vous appelle concernant le bien immobilier situé ${location} 
+            au prix de ${price} euros par mois. 
+            
+            Je vous ai envoyé un email récemment mais n'ai pas eu de retour. 
+            
+            Je suis très intéressé par ce bien et souhaiterais organiser une visite rapidement. 
+            Je dispose de tous les documents nécessaires.
+            
+            Pourriez-vous me rappeler pour organiser une visite ? 
+            
+            Je vous remercie et vous souhaite une bonne journée.
+        </Say>
+        <Pause length="2"/>
+        <Say voice="alice" language="fr-FR">
+            Merci, au revoir.
+        </Say>
+    </Response>"""))
+
+_INITIAL_CALL_TPL = Template(textwrap.dedent("""\
+    <?xml version="1.0" encoding="UTF-8"?>
+    <Response>
+        <Pause length="1"/>
+        <Say voice="alice" language="fr-FR">
+            Bonjour, je vous appelle concernant votre annonce immobilière pour le bien situé ${location}.
+            
+            Le bien proposé à ${price} euros par mois m'intéresse beaucoup.
+            
+            Je souhaiterais organiser une visite dans les plus brefs délais. 
+            Je dispose de tous les justificatifs nécessaires pour la location.
+            
+            Pourriez-vous me rappeler pour convenir d'un rendez-vous ?
+            
+            Je vous remercie et reste dans l'attente de votre retour.
+        </Say>
+        <Pause length="2"/>
+        <Say voice="alice" language="fr-FR">
+            Bonne journée.
+        </Say>
+    </Response>"""))
+
 class PhoneCaller:
     """Handles automated phone communications using Twilio"""
     
+    # Flush buffered communication logs once this many are pending
+    LOG_FLUSH_THRESHOLD = 20
+    
     def __init__(self, config: Config):
         self.config = config
         self.client = None
+        self._async_client = None
+        # Dispatcher threads share this caller, so the buffer is locked
+        self._pending_comms = []
+        self._comms_lock = threading.Lock()
         
         if self.config.TWILIO_ACCOUNT_SID and self.config.TWILIO_AUTH_TOKEN:
             try:
@@ -27,12 +89,138 @@ class PhoneCaller:
                     self.config.TWILIO_ACCOUNT_SID,
                     self.config.TWILIO_AUTH_TOKEN
                 )
+                self._tune_http_session()
                 logger.info("✅ Twilio client initialized successfully")
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize Twilio client: {str(e)}")
+            except Exception:
+                logger.exception("❌ Failed to initialize Twilio client")
         else:
             logger.warning("⚠️ Twilio credentials not configured - phone calling disabled")
     
+    def _tune_http_session(self):
+        """Size the Twilio client's connection pool for bursts of calls
+
+        The underlying requests.Session defaults to 10 pooled
+        connections; a burst of calls beyond that opens fresh TCP/TLS
+        connections to api.twilio.com. Widen the pool and add backoff
+        retries for transient API errors (POSTs are not retried, so a
+        flaky network can't double-dial a contact).
+        """
+        try:
+            session = self.client.http_client.session
+        except AttributeError:
+            logger.debug("Twilio http client has no session to tune")
+            return
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        session.mount('https://', adapter)
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Lazily create the shared async HTTP client for the Twilio API
+
+        One keep-alive connection pool serves every call in a batch, so
+        the TCP/TLS handshake is paid once instead of once per call.
+        """
+        if self._async_client is None:
+            sid = self.config.TWILIO_ACCOUNT_SID
+            self._async_client = httpx.AsyncClient(
+                base_url=f"https://api.twilio.com/2010-04-01/Accounts/{sid}",
+                auth=(sid, self.config.TWILIO_AUTH_TOKEN),
+                timeout=30.0,
+                limits=httpx.Limits(max_keepalive_connections=20)
+            )
+        return self._async_client
+    
+    async def aclose(self):
+        """Close the shared async HTTP client"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+    
+    async def _create_call_async(self, twiml: str, to: str) -> Dict[str, Any]:
+        """POST a call to the Twilio REST API over the shared client"""
+        response = await self._get_async_client().post('/Calls.json', data={
+            'Twiml': twiml,
+            'To': to,
+            'From': self.config.TWILIO_PHONE_NUMBER,
+            'Record': 'true',
+            'Timeout': '30'
+        })
+        response.raise_for_status()
+        return response.json()
+    
+    async def _make_call_async(self, contact: Contact, script_type: str) -> bool:
+        """Shared async path for initial and follow-up calls"""
+        if not self.is_configured():
+            logger.warning("Twilio not configured - cannot make phone call")
+            return False
+        
+        if not contact.phone:
+            logger.warning("No phone number for contact %s", contact.id)
+            return False
+        
+        try:
+            with session_scope() as db:
+                property_obj = db.query(Property).get(contact.property_id)
+            
+            if not property_obj:
+                return False
+            
+            twiml_message = self._build_script(
+                script_type, property_obj.address or property_obj.city, property_obj.price)
+            
+            call = await self._create_call_async(twiml_message, contact.phone)
+            
+            label = 'Appel initial' if script_type == 'initial' else 'Appel automatique'
+            self._log_communication(
+                property_obj, 
+                contact, 
+                'phone', 
+                f"{label} - {property_obj.title}", 
+                twiml_message, 
+                'initiated',
+                {'call_sid': call.get('sid'), 'twilio_status': call.get('status')}
+            )
+            
+            logger.info("✅ Phone call initiated for contact %s - Call SID: %s", contact.id, call.get('sid'))
+            return True
+            
+        except httpx.HTTPError as e:
+            logger.error("❌ Twilio API error making call to contact %s: %s", contact.id, e)
+            return False
+        except Exception:
+            logger.exception("❌ Error making call to contact %s", contact.id)
+            return False
+    
+    async def make_initial_call_async(self, contact: Contact) -> bool:
+        """Make initial automated call without blocking the event loop"""
+        return await self._make_call_async(contact, 'initial')
+    
+    async def make_follow_up_call_async(self, contact: Contact) -> bool:
+        """Make automated follow-up call without blocking the event loop"""
+        return await self._make_call_async(contact, 'follow_up')
+    
+    async def make_batch_calls(self, contacts: list, script_type: str = 'follow_up') -> int:
+        """Place calls for a batch of contacts concurrently
+        
+        All POSTs share the keep-alive connection pool, so a batch of 50
+        calls overlaps its API round-trips instead of serializing them.
+        """
+        results = await asyncio.gather(
+            *[self._make_call_async(contact, script_type) for contact in contacts],
+            return_exceptions=True
+        )
+        sent = sum(1 for r in results if r is True)
+        self.flush_log()
+        logger.info("✅ Batch calling completed: %d/%d calls placed", sent, len(contacts))
+        return sent
+    
     def make_follow_up_call(self, contact: Contact) -> bool:
         """Make automated follow-up call"""
         if not self.client:
@@ -40,12 +228,12 @@ class PhoneCaller:
             return False
         
         if not contact.phone:
-            logger.warning(f"No phone number for contact {contact.id}")
+            logger.warning("No phone number for contact %s", contact.id)
             return False
         
         try:
-            db = get_db()
-            property_obj = db.query(Property).get(contact.property_id)
+            with session_scope() as db:
+                property_obj = db.query(Property).get(contact.property_id)
             
             if not property_obj:
                 return False
@@ -75,18 +263,15 @@ class PhoneCaller:
                 {'call_sid': call.sid, 'twilio_status': call.status}
             )
             
-            logger.info(f"✅ Phone call initiated for contact {contact.id} - Call SID: {call.sid}")
+            logger.info("✅ Phone call initiated for contact %s - Call SID: %s", contact.id, call.sid)
             return True
             
         except TwilioException as e:
-            logger.error(f"❌ Twilio error making call to contact {contact.id}: {str(e)}")
+            logger.error("❌ Twilio error making call to contact %s: %s", contact.id, e)
             return False
-        except Exception as e:
-            logger.error(f"❌ Error making call to contact {contact.id}: {str(e)}")
+        except Exception:
+            logger.exception("❌ Error making call to contact %s", contact.id)
             return False
-        finally:
-            if 'db' in locals():
-                db.close()
     
     def make_initial_call(self, contact: Contact) -> bool:
         """Make initial automated call"""
@@ -95,12 +280,12 @@ class PhoneCaller:
             return False
         
         if not contact.phone:
-            logger.warning(f"No phone number for contact {contact.id}")
+            logger.warning("No phone number for contact %s", contact.id)
             return False
         
         try:
-            db = get_db()
-            property_obj = db.query(Property).get(contact.property_id)
+            with session_scope() as db:
+                property_obj = db.query(Property).get(contact.property_id)
             
             if not property_obj:
                 return False
@@ -128,153 +313,118 @@ class PhoneCaller:
                 {'call_sid': call.sid, 'twilio_status': call.status}
             )
             
-            logger.info(f"✅ Initial phone call made for contact {contact.id} - Call SID: {call.sid}")
+            logger.info("✅ Initial phone call made for contact %s - Call SID: %s", contact.id, call.sid)
             return True
             
         except TwilioException as e:
-            logger.error(f"❌ Twilio error making initial call to contact {contact.id}: {str(e)}")
+            logger.error("❌ Twilio error making initial call to contact %s: %s", contact.id, e)
             return False
-        except Exception as e:
-            logger.error(f"❌ Error making initial call to contact {contact.id}: {str(e)}")
+        except Exception:
+            logger.exception("❌ Error making initial call to contact %s", contact.id)
             return False
-        finally:
-            if 'db' in locals():
-                db.close()
+    
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _build_script(script_type: str, location: str, price: float) -> str:
+        """Render (and cache) the TwiML for a script type and property
+
+        Keyed on the interpolated values only, so a property with several
+        contacts reuses the same rendered script.
+        """
+        tpl = _INITIAL_CALL_TPL if script_type == 'initial' else _FOLLOW_UP_CALL_TPL
+        return tpl.substitute(location=location, price=price)
     
     def _generate_call_script(self, property_obj: Property, contact: Contact) -> str:
         """Generate TwiML script for follow-up call"""
-        agency_name = contact.agency_name or "votre agence"
-        
-        script = f"""
-        <?xml version="1.0" encoding="UTF-8"?>
-        <Response>
-            <Pause length="1"/>
-            <Say voice="alice" language="fr-FR">
-                Bonjour, je vous appelle concernant le bien immobilier situé {property_obj.address or property_obj.city} 
-                au prix de {property_obj.price} euros par mois. 
-                
-                Je vous ai envoyé un email récemment mais n'ai pas eu de retour. 
-                
-                Je suis très intéressé par ce bien et souhaiterais organiser une visite rapidement. 
-                Je dispose de tous les documents nécessaires.
-                
-                Pourriez-vous me rappeler pour organiser une visite ? 
-                
-                Je vous remercie et vous souhaite une bonne journée.
-            </Say>
-            <Pause length="2"/>
-            <Say voice="alice" language="fr-FR">
-                Merci, au revoir.
-            </Say>
-        </Response>
-        """
-        
-        return script.strip()
+        return self._build_script('follow_up', property_obj.address or property_obj.city, property_obj.price)
     
     def _generate_initial_call_script(self, property_obj: Property, contact: Contact) -> str:
         """Generate TwiML script for initial call"""
-        script = f"""
-        <?xml version="1.0" encoding="UTF-8"?>
-        <Response>
-            <Pause length="1"/>
-            <Say voice="alice" language="fr-FR">
-                Bonjour, je vous appelle concernant votre annonce immobilière pour le bien situé {property_obj.address or property_obj.city}.
-                
-                Le bien proposé à {property_obj.price} euros par mois m'intéresse beaucoup.
-                
-                Je souhaiterais organiser une visite dans les plus brefs délais. 
-                Je dispose de tous les justificatifs nécessaires pour la location.
-                
-                Pourriez-vous me rappeler pour convenir d'un rendez-vous ?
-                
-                Je vous remercie et reste dans l'attente de votre retour.
-            </Say>
-            <Pause length="2"/>
-            <Say voice="alice" language="fr-FR">
-                Bonne journée.
-            </Say>
-        </Response>
-        """
-        
-        return script.strip()
+        return self._build_script('initial', property_obj.address or property_obj.city, property_obj.price)
     
     def _log_communication(self, property_obj: Property, contact: Contact, method: str, subject: str, message: str, status: str, metadata: Dict[str, Any] = None):
-        """Log phone communication in database"""
+        """Buffer a phone communication record for bulk insertion"""
+        with self._comms_lock:
+            self._pending_comms.append({
+                'property_id': property_obj.id,
+                'contact_id': contact.id,
+                'method': ContactMethod.PHONE,
+                'subject': subject,
+                'message': message,
+                'status': status,
+                'sent_at': datetime.utcnow(),
+                'call_sid': (metadata or {}).get('call_sid'),
+                'metadata': metadata or {}
+            })
+            should_flush = len(self._pending_comms) >= self.LOG_FLUSH_THRESHOLD
+        
+        if should_flush:
+            self.flush_log()
+    
+    def flush_log(self):
+        """Write all buffered communication records in one transaction"""
+        # Swap the buffer out under the lock and write outside it, so a
+        # slow insert never blocks threads that are only appending
+        with self._comms_lock:
+            batch, self._pending_comms = self._pending_comms, []
+        if not batch:
+            return
+        
         try:
-            db = get_db()
-            
-            communication = Communication(
-                property_id=property_obj.id,
-                contact_id=contact.id,
-                method=ContactMethod.PHONE,
-                subject=subject,
-                message=message,
-                status=status,
-                sent_at=datetime.utcnow(),
-                metadata=metadata or {}
-            )
-            
-            db.add(communication)
-            db.commit()
-            
-        except Exception as e:
-            logger.error(f"Error logging phone communication: {str(e)}")
-        finally:
-            if 'db' in locals():
-                db.close()
+            with session_scope() as db:
+                # Core executemany - skips ORM instance and identity-map overhead
+                db.execute(Communication.__table__.insert(), batch)
+        except Exception:
+            logger.exception("Error flushing phone communication logs")
+            with self._comms_lock:
+                self._pending_comms = batch + self._pending_comms
     
     def handle_call_status_update(self, call_sid: str, status: str, duration: str = None) -> bool:
         """Handle Twilio webhook for call status updates"""
+        # Make sure any buffered records are visible before looking one up
+        self.flush_log()
+        
         try:
-            db = get_db()
-            
-            # Find communication record by call SID
-            communication = db.query(Communication).filter(
-                Communication.metadata.contains({'call_sid': call_sid})
-            ).first()
-            
-            if communication:
+            with session_scope() as db:
+                # Find communication record by call SID (indexed column seek)
+                communication = db.query(Communication).filter(
+                    Communication.call_sid == call_sid
+                ).first()
+                
+                if not communication:
+                    logger.warning("⚠️ Communication record not found for call SID: %s", call_sid)
+                    return False
+                
                 # Update communication status
                 communication.status = status
                 
                 if status == 'completed' and duration:
-                    if not communication.metadata:
-                        communication.metadata = {}
-                    communication.metadata['duration'] = duration
+                    if not communication.meta:
+                        communication.meta = {}
+                    communication.meta['duration'] = duration
                     communication.delivered_at = datetime.utcnow()
                 
-                db.commit()
-                logger.info(f"✅ Updated call status for SID {call_sid}: {status}")
+                logger.info("✅ Updated call status for SID %s: %s", call_sid, status)
                 return True
-            else:
-                logger.warning(f"⚠️ Communication record not found for call SID: {call_sid}")
-                return False
                 
-        except Exception as e:
-            logger.error(f"❌ Error handling call status update: {str(e)}")
+        except Exception:
+            logger.exception("❌ Error handling call status update")
             return False
-        finally:
-            if 'db' in locals():
-                db.close()
     
     def get_call_history(self, contact_id: int) -> list:
         """Get call history for a specific contact"""
         try:
-            db = get_db()
-            
-            calls = db.query(Communication).filter(
-                Communication.contact_id == contact_id,
-                Communication.method == ContactMethod.PHONE
-            ).order_by(Communication.sent_at.desc()).all()
-            
-            return [call.to_dict() for call in calls]
+            with session_scope() as db:
+                calls = db.query(Communication).filter(
+                    Communication.contact_id == contact_id,
+                    Communication.method == ContactMethod.PHONE
+                ).order_by(Communication.sent_at.desc()).all()
+                
+                return [call.to_dict() for call in calls]
             
-        except Exception as e:
-            logger.error(f"Error getting call history for contact {contact_id}: {str(e)}")
+        except Exception:
+            logger.exception("Error getting call history for contact %s", contact_id)
             return []
-        finally:
-            if 'db' in locals():
-                db.close()
     
     def is_configured(self) -> bool:
         """Check if Twilio is properly configured"""
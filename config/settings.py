@@ -3,146 +3,231 @@ Configuration settings for French Real Estate Rental Hunter
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Any, Tuple
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SearchCriteria:
-    """Search criteria configuration"""
-    cities: List[str]
+    """Search criteria configuration
+
+    Frozen with tuple fields so instances are hashable - scrapers use
+    that to memoize per-(criteria, city, page) work like search URLs.
+    """
+    cities: Tuple[str, ...]
     max_price: int
     min_price: int
     min_rooms: int
     max_rooms: int
-    property_types: List[str]  # ['apartment', 'house', 'studio']
-    keywords: List[str]
-    exclude_keywords: List[str]
+    property_types: Tuple[str, ...]  # ('apartment', 'house', 'studio')
+    keywords: Tuple[str, ...]
+    exclude_keywords: Tuple[str, ...]
 
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Main configuration class"""
-    
+    """Main configuration, loaded once from the environment
+
+    A frozen snapshot built by load(): the environment is read in a
+    single pass instead of one os.getenv call per attribute, and slots
+    keep attribute access off the instance __dict__. Use get_config()
+    to share the cached instance.
+    """
+
     # Project paths
-    BASE_DIR = Path(__file__).parent.parent
-    DATA_DIR = BASE_DIR / "data"
-    LOGS_DIR = BASE_DIR / "logs"
-    
-    # Ensure directories exist
-    DATA_DIR.mkdir(exist_ok=True)
-    LOGS_DIR.mkdir(exist_ok=True)
-    
+    BASE_DIR: Path
+    DATA_DIR: Path
+    LOGS_DIR: Path
+
     # Database configuration
-    DATABASE_URL = os.getenv('DATABASE_URL', f'sqlite:///{DATA_DIR}/rental_hunter.db')
-    
+    DATABASE_URL: str
+
     # Flask configuration
-    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-this')
-    DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
-    TESTING = False
-    
+    SECRET_KEY: str
+    DEBUG: bool
+    TESTING: bool
+
     # Scraping configuration
-    SCRAPING_DELAY_MIN = int(os.getenv('SCRAPING_DELAY_MIN', '2'))  # seconds
-    SCRAPING_DELAY_MAX = int(os.getenv('SCRAPING_DELAY_MAX', '5'))  # seconds
-    MAX_CONCURRENT_SCRAPERS = int(os.getenv('MAX_CONCURRENT_SCRAPERS', '3'))
-    USE_PROXY = os.getenv('USE_PROXY', 'False').lower() == 'true'
-    
+    SCRAPING_DELAY_MIN: int  # seconds
+    SCRAPING_DELAY_MAX: int  # seconds
+    MAX_CONCURRENT_SCRAPERS: int
+    USE_PROXY: bool
+
     # User agent for web scraping
-    USER_AGENT = os.getenv('USER_AGENT', 
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36')
-    
+    USER_AGENT: str
+
     # Email configuration
-    SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-    SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
-    SMTP_USERNAME = os.getenv('SMTP_USERNAME', '')
-    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
-    EMAIL_FROM = os.getenv('EMAIL_FROM', SMTP_USERNAME)
-    EMAIL_FROM_NAME = os.getenv('EMAIL_FROM_NAME', 'Rental Hunter Bot')
-    
+    SMTP_SERVER: str
+    SMTP_PORT: int
+    SMTP_USE_SSL: bool
+    SMTP_POOL_SIZE: int
+    SMTP_USERNAME: str
+    SMTP_PASSWORD: str
+    EMAIL_FROM: str
+    EMAIL_FROM_NAME: str
+
     # Twilio configuration for phone calls
-    TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID', '')
-    TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN', '')
-    TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER', '')
-    
+    TWILIO_ACCOUNT_SID: str
+    TWILIO_AUTH_TOKEN: str
+    TWILIO_PHONE_NUMBER: str
+
     # Contact management
-    MAX_CONTACT_ATTEMPTS = int(os.getenv('MAX_CONTACT_ATTEMPTS', '3'))
-    FOLLOW_UP_DELAY_HOURS = int(os.getenv('FOLLOW_UP_DELAY_HOURS', '24'))
-    EMAIL_TEMPLATE_DIR = BASE_DIR / "templates" / "email"
-    
+    MAX_CONTACT_ATTEMPTS: int
+    FOLLOW_UP_DELAY_HOURS: int
+    EMAIL_TEMPLATE_DIR: Path
+
     # Scheduler configuration
-    ENABLE_SCHEDULER = os.getenv('ENABLE_SCHEDULER', 'True').lower() == 'true'
-    SCRAPING_SCHEDULE = os.getenv('SCRAPING_SCHEDULE', '0 9,15,21 * * *')  # 9AM, 3PM, 9PM daily
-    CONTACT_SCHEDULE = os.getenv('CONTACT_SCHEDULE', '0 10,16 * * *')  # 10AM, 4PM daily
-    FOLLOW_UP_SCHEDULE = os.getenv('FOLLOW_UP_SCHEDULE', '0 11,17 * * *')  # 11AM, 5PM daily
-    
+    ENABLE_SCHEDULER: bool
+    SCRAPING_SCHEDULE: str
+    CONTACT_SCHEDULE: str
+    FOLLOW_UP_SCHEDULE: str
+
     # Search criteria - can be overridden via environment or web interface
-    DEFAULT_SEARCH_CRITERIA = SearchCriteria(
-        cities=os.getenv('SEARCH_CITIES', 'Paris,Lyon,Marseille,Toulouse,Nice').split(','),
-        max_price=int(os.getenv('MAX_PRICE', '1500')),
-        min_price=int(os.getenv('MIN_PRICE', '500')),
-        min_rooms=int(os.getenv('MIN_ROOMS', '1')),
-        max_rooms=int(os.getenv('MAX_ROOMS', '4')),
-        property_types=os.getenv('PROPERTY_TYPES', 'apartment,studio').split(','),
-        keywords=os.getenv('SEARCH_KEYWORDS', 'balcon,parking,métro,transport').split(','),
-        exclude_keywords=os.getenv('EXCLUDE_KEYWORDS', 'meublé,furnished,colocation').split(',')
-    )
-    
+    DEFAULT_SEARCH_CRITERIA: SearchCriteria
+
     # Supported rental sites
-    ENABLED_SCRAPERS = {
-        'seloger': os.getenv('ENABLE_SELOGER', 'True').lower() == 'true',
-        'leboncoin': os.getenv('ENABLE_LEBONCOIN', 'True').lower() == 'true',
-        'pap': os.getenv('ENABLE_PAP', 'True').lower() == 'true',
-        'logic_immo': os.getenv('ENABLE_LOGIC_IMMO', 'True').lower() == 'true',
-        'bienici': os.getenv('ENABLE_BIENICI', 'True').lower() == 'true',
-    }
-    
+    ENABLED_SCRAPERS: Dict[str, bool]
+
     # Duplicate detection thresholds
-    ADDRESS_SIMILARITY_THRESHOLD = float(os.getenv('ADDRESS_SIMILARITY_THRESHOLD', '0.85'))
-    DESCRIPTION_SIMILARITY_THRESHOLD = float(os.getenv('DESCRIPTION_SIMILARITY_THRESHOLD', '0.75'))
-    PRICE_DIFFERENCE_THRESHOLD = int(os.getenv('PRICE_DIFFERENCE_THRESHOLD', '50'))  # euros
-    
+    ADDRESS_SIMILARITY_THRESHOLD: float
+    DESCRIPTION_SIMILARITY_THRESHOLD: float
+    PRICE_DIFFERENCE_THRESHOLD: int  # euros
+
     # Logging configuration
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-    LOG_FILE = LOGS_DIR / 'rental_hunter.log'
-    LOG_MAX_SIZE = int(os.getenv('LOG_MAX_SIZE', '10485760'))  # 10MB
-    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
-    
+    LOG_LEVEL: str
+    LOG_FILE: Path
+    LOG_MAX_SIZE: int
+    LOG_BACKUP_COUNT: int
+
+    # Base URLs per scraper (class constant, not an env-driven field)
+    _SCRAPER_URLS = {
+        'seloger': 'https://www.seloger.com',
+        'leboncoin': 'https://www.leboncoin.fr',
+        'pap': 'https://www.pap.fr',
+        'logic_immo': 'https://www.logic-immo.com',
+        'bienici': 'https://www.bienici.com'
+    }
+
     @classmethod
-    def validate_config(cls) -> Dict[str, Any]:
+    def load(cls) -> "Config":
+        """Build a Config from a single pass over the environment"""
+        get = os.environ.get
+
+        base_dir = Path(__file__).parent.parent
+        data_dir = base_dir / "data"
+        logs_dir = base_dir / "logs"
+
+        # Ensure directories exist
+        data_dir.mkdir(exist_ok=True)
+        logs_dir.mkdir(exist_ok=True)
+
+        smtp_port = int(get('SMTP_PORT', '587'))
+        smtp_username = get('SMTP_USERNAME', '')
+
+        return cls(
+            BASE_DIR=base_dir,
+            DATA_DIR=data_dir,
+            LOGS_DIR=logs_dir,
+            DATABASE_URL=get('DATABASE_URL', f'sqlite:///{data_dir}/rental_hunter.db'),
+            SECRET_KEY=get('SECRET_KEY', 'your-secret-key-change-this'),
+            DEBUG=get('DEBUG', 'False').lower() == 'true',
+            TESTING=False,
+            SCRAPING_DELAY_MIN=int(get('SCRAPING_DELAY_MIN', '2')),
+            SCRAPING_DELAY_MAX=int(get('SCRAPING_DELAY_MAX', '5')),
+            MAX_CONCURRENT_SCRAPERS=int(get('MAX_CONCURRENT_SCRAPERS', '3')),
+            USE_PROXY=get('USE_PROXY', 'False').lower() == 'true',
+            USER_AGENT=get('USER_AGENT',
+                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'),
+            SMTP_SERVER=get('SMTP_SERVER', 'smtp.gmail.com'),
+            SMTP_PORT=smtp_port,
+            # Implicit TLS (port 465) skips the EHLO/STARTTLS/EHLO round-trips
+            SMTP_USE_SSL=get('SMTP_USE_SSL', 'True' if smtp_port == 465 else 'False').lower() == 'true',
+            SMTP_POOL_SIZE=int(get('SMTP_POOL_SIZE', '4')),  # concurrent batch-send workers
+            SMTP_USERNAME=smtp_username,
+            SMTP_PASSWORD=get('SMTP_PASSWORD', ''),
+            EMAIL_FROM=get('EMAIL_FROM', smtp_username),
+            EMAIL_FROM_NAME=get('EMAIL_FROM_NAME', 'Rental Hunter Bot'),
+            TWILIO_ACCOUNT_SID=get('TWILIO_ACCOUNT_SID', ''),
+            TWILIO_AUTH_TOKEN=get('TWILIO_AUTH_TOKEN', ''),
+            TWILIO_PHONE_NUMBER=get('TWILIO_PHONE_NUMBER', ''),
+            MAX_CONTACT_ATTEMPTS=int(get('MAX_CONTACT_ATTEMPTS', '3')),
+            FOLLOW_UP_DELAY_HOURS=int(get('FOLLOW_UP_DELAY_HOURS', '24')),
+            EMAIL_TEMPLATE_DIR=base_dir / "templates" / "email",
+            ENABLE_SCHEDULER=get('ENABLE_SCHEDULER', 'True').lower() == 'true',
+            SCRAPING_SCHEDULE=get('SCRAPING_SCHEDULE', '0 9,15,21 * * *'),  # 9AM, 3PM, 9PM daily
+            CONTACT_SCHEDULE=get('CONTACT_SCHEDULE', '0 10,16 * * *'),  # 10AM, 4PM daily
+            FOLLOW_UP_SCHEDULE=get('FOLLOW_UP_SCHEDULE', '0 11,17 * * *'),  # 11AM, 5PM daily
+            DEFAULT_SEARCH_CRITERIA=SearchCriteria(
+                cities=tuple(get('SEARCH_CITIES', 'Paris,Lyon,Marseille,Toulouse,Nice').split(',')),
+                max_price=int(get('MAX_PRICE', '1500')),
+                min_price=int(get('MIN_PRICE', '500')),
+                min_rooms=int(get('MIN_ROOMS', '1')),
+                max_rooms=int(get('MAX_ROOMS', '4')),
+                property_types=tuple(get('PROPERTY_TYPES', 'apartment,studio').split(',')),
+                keywords=tuple(get('SEARCH_KEYWORDS', 'balcon,parking,métro,transport').split(',')),
+                exclude_keywords=tuple(get('EXCLUDE_KEYWORDS', 'meublé,furnished,colocation').split(','))
+            ),
+            ENABLED_SCRAPERS={
+                'seloger': get('ENABLE_SELOGER', 'True').lower() == 'true',
+                'leboncoin': get('ENABLE_LEBONCOIN', 'True').lower() == 'true',
+                'pap': get('ENABLE_PAP', 'True').lower() == 'true',
+                'logic_immo': get('ENABLE_LOGIC_IMMO', 'True').lower() == 'true',
+                'bienici': get('ENABLE_BIENICI', 'True').lower() == 'true',
+            },
+            ADDRESS_SIMILARITY_THRESHOLD=float(get('ADDRESS_SIMILARITY_THRESHOLD', '0.85')),
+            DESCRIPTION_SIMILARITY_THRESHOLD=float(get('DESCRIPTION_SIMILARITY_THRESHOLD', '0.75')),
+            PRICE_DIFFERENCE_THRESHOLD=int(get('PRICE_DIFFERENCE_THRESHOLD', '50')),
+            LOG_LEVEL=get('LOG_LEVEL', 'INFO'),
+            LOG_FILE=logs_dir / 'rental_hunter.log',
+            LOG_MAX_SIZE=int(get('LOG_MAX_SIZE', '10485760')),  # 10MB
+            LOG_BACKUP_COUNT=int(get('LOG_BACKUP_COUNT', '5'))
+        )
+
+    def validate_config(self) -> Dict[str, Any]:
         """Validate configuration and return status"""
         issues = []
         warnings = []
-        
+
         # Check required email settings
-        if not cls.SMTP_USERNAME or not cls.SMTP_PASSWORD:
+        if not self.SMTP_USERNAME or not self.SMTP_PASSWORD:
             issues.append("SMTP credentials not configured")
-        
+
         # Check Twilio settings if calling is enabled
-        if not cls.TWILIO_ACCOUNT_SID or not cls.TWILIO_AUTH_TOKEN:
+        if not self.TWILIO_ACCOUNT_SID or not self.TWILIO_AUTH_TOKEN:
             warnings.append("Twilio not configured - phone calling disabled")
-        
+
         # Check search criteria
-        if not cls.DEFAULT_SEARCH_CRITERIA.cities:
+        if not self.DEFAULT_SEARCH_CRITERIA.cities:
             issues.append("No cities specified in search criteria")
-        
-        if cls.DEFAULT_SEARCH_CRITERIA.max_price <= cls.DEFAULT_SEARCH_CRITERIA.min_price:
+
+        if self.DEFAULT_SEARCH_CRITERIA.max_price <= self.DEFAULT_SEARCH_CRITERIA.min_price:
             issues.append("Invalid price range in search criteria")
-        
+
         return {
             'valid': len(issues) == 0,
             'issues': issues,
             'warnings': warnings
         }
-    
-    @classmethod
-    def get_scraper_urls(cls) -> Dict[str, str]:
+
+    def get_scraper_urls(self) -> Dict[str, str]:
         """Get base URLs for enabled scrapers"""
-        return {
-            'seloger': 'https://www.seloger.com',
-            'leboncoin': 'https://www.leboncoin.fr',
-            'pap': 'https://www.pap.fr',
-            'logic_immo': 'https://www.logic-immo.com',
-            'bienici': 'https://www.bienici.com'
-        }
\ No newline at end of file
+        return dict(self._SCRAPER_URLS)
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Return the shared Config instance, loading it on first use"""
+    return Config.load()
+
+@lru_cache(maxsize=1)
+def validate_config() -> Dict[str, Any]:
+    """Cached validation result for the shared Config instance"""
+    return get_config().validate_config()
+
+@lru_cache(maxsize=1)
+def get_scraper_urls() -> Dict[str, str]:
+    """Cached scraper base URLs for the shared Config instance"""
+    return get_config().get_scraper_urls()
@@ -0,0 +1,111 @@
+"""
+One-off schema migration for pre-existing databases
+
+Base.metadata.create_all() only creates missing tables, so databases
+created before the integer status columns, the hashed URL column and
+the other late additions need this script run once:
+
+    python -m database.migrate
+
+It adds the missing columns, converts string enum values to their
+integer codes, backfills the derived columns and creates the indexes
+added to existing tables. Running it again is harmless - every step
+checks before it writes. Fresh databases need nothing; init_db()
+creates the current schema directly.
+"""
+
+import logging
+
+from sqlalchemy import text
+
+from database import models
+from database.models import Base, ContactMethod, ContactStatus, PropertyStatus, url_hash64
+
+logger = logging.getLogger(__name__)
+
+# Columns added after the original schema, per table
+_ADDED_COLUMNS = {
+    'properties': {
+        'city_lc': 'VARCHAR(100)',
+        'url_hash': 'BIGINT',
+    },
+    'communications': {
+        'template_name': 'VARCHAR(50)',
+        'context': 'JSON',
+        'call_sid': 'VARCHAR(64)',
+    },
+}
+
+# Columns that moved from lowercase strings to integer enum codes
+_ENUM_COLUMNS = [
+    ('properties', 'status', PropertyStatus),
+    ('contacts', 'status', ContactStatus),
+    ('contacts', 'preferred_method', ContactMethod),
+    ('communications', 'method', ContactMethod),
+]
+
+def _existing_columns(conn, table: str) -> set:
+    """Column names currently present on a table"""
+    return {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+
+def _enum_conversion_sql(table: str, column: str, enum_cls) -> text:
+    """UPDATE converting a column's string labels to integer codes
+
+    Only rows still holding a label are touched, so reruns are no-ops.
+    The original VARCHAR columns keep TEXT affinity, so the codes land
+    as digit strings; _LabeledIntEnum accepts those on read.
+    """
+    whens = ' '.join(
+        f"WHEN '{member.label}' THEN {member.value}" for member in enum_cls)
+    labels = ', '.join(f"'{member.label}'" for member in enum_cls)
+    return text(
+        f"UPDATE {table} SET {column} = CASE lower({column}) {whens} "
+        f"ELSE {column} END WHERE lower({column}) IN ({labels})")
+
+def migrate():
+    """Bring an existing database up to the current schema"""
+    if models.SessionLocal is None:
+        models.init_db()
+
+    with models.engine.begin() as conn:
+        # Missing columns
+        for table, columns in _ADDED_COLUMNS.items():
+            existing = _existing_columns(conn, table)
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                    logger.info("Added %s.%s", table, name)
+
+        # String enum values -> integer codes
+        for table, column, enum_cls in _ENUM_COLUMNS:
+            result = conn.execute(_enum_conversion_sql(table, column, enum_cls))
+            if result.rowcount:
+                logger.info("Converted %s rows of %s.%s to integer codes",
+                            result.rowcount, table, column)
+
+        # Derived columns
+        conn.execute(text(
+            "UPDATE properties SET city_lc = lower(trim(city)) "
+            "WHERE city_lc IS NULL AND city IS NOT NULL"))
+
+        rows = conn.execute(text(
+            "SELECT id, source_url FROM properties "
+            "WHERE url_hash IS NULL AND source_url IS NOT NULL")).fetchall()
+        for prop_id, source_url in rows:
+            conn.execute(
+                text("UPDATE properties SET url_hash = :h WHERE id = :id"),
+                {'h': url_hash64(source_url), 'id': prop_id})
+        if rows:
+            logger.info("Backfilled url_hash for %s properties", len(rows))
+
+    # Indexes added to existing tables - create_all skips tables that
+    # already exist, indexes included
+    for table in Base.metadata.tables.values():
+        for index in table.indexes:
+            index.create(bind=models.engine, checkfirst=True)
+
+    logger.info("Migration complete")
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    migrate()
@@ -2,50 +2,96 @@
 Database models for French Real Estate Rental Hunter
 """
 
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from enum import Enum
+from enum import IntEnum
 from typing import Dict, Any
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, Enum as SQLEnum
+import orjson
+import xxhash
+from sqlalchemy import create_engine, event, func, BigInteger, Column, Index, Integer, SmallInteger, String, Text, DateTime, Float, Boolean, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import sessionmaker, relationship, Session
 from sqlalchemy.dialects.sqlite import JSON
 
-from config.settings import Config
+from config.settings import get_config
 
 # Database setup
 Base = declarative_base()
+
+def url_hash64(url: str) -> int:
+    """64-bit xxhash of a source URL, shifted into SQLite's signed range
+
+    Existence probes match on this integer instead of the long VARCHAR
+    source_url: index pages hold far more integer keys, and comparison
+    is one instruction instead of a byte-wise strcmp.
+    """
+    digest = xxhash.xxh64_intdigest(url)
+    return digest - (1 << 64) if digest >= (1 << 63) else digest
+
 engine = None
 SessionLocal = None
 
-class PropertyStatus(Enum):
+class _LabeledIntEnum(IntEnum):
+    """IntEnum stored as a small integer in the database
+
+    Integer codes keep enum columns and their indexes compact and make
+    status filters integer compares instead of string compares. label
+    reproduces the lowercase string the columns used to store, and
+    _missing_ still accepts that string so lookups like
+    PropertyStatus('new') keep working for web filters and API input.
+    It also accepts digit strings like '1': SQLite stores whatever a
+    migrated VARCHAR column holds with TEXT affinity, so integer codes
+    written by database.migrate come back as text.
+    """
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+    @classmethod
+    def _missing_(cls, value):
+        if isinstance(value, str):
+            if value.isdigit():
+                try:
+                    return cls(int(value))
+                except ValueError:
+                    return None
+            try:
+                return cls[value.upper()]
+            except KeyError:
+                return None
+        return None
+
+class PropertyStatus(_LabeledIntEnum):
     """Status of a rental property"""
-    NEW = "new"
-    CONTACTED = "contacted"
-    RESPONDED = "responded"
-    VISIT_SCHEDULED = "visit_scheduled"
-    VISITED = "visited"
-    APPLICATION_SENT = "application_sent"
-    ACCEPTED = "accepted"
-    REJECTED = "rejected"
-    UNAVAILABLE = "unavailable"
-    DUPLICATE = "duplicate"
-
-class ContactStatus(Enum):
+    NEW = 1
+    CONTACTED = 2
+    RESPONDED = 3
+    VISIT_SCHEDULED = 4
+    VISITED = 5
+    APPLICATION_SENT = 6
+    ACCEPTED = 7
+    REJECTED = 8
+    UNAVAILABLE = 9
+    DUPLICATE = 10
+
+class ContactStatus(_LabeledIntEnum):
     """Status of contact attempts"""
-    PENDING = "pending"
-    EMAIL_SENT = "email_sent"
-    PHONE_CALLED = "phone_called"
-    RESPONDED = "responded"
-    NO_RESPONSE = "no_response"
-    FAILED = "failed"
-    BLOCKED = "blocked"
-
-class ContactMethod(Enum):
+    PENDING = 1
+    EMAIL_SENT = 2
+    PHONE_CALLED = 3
+    RESPONDED = 4
+    NO_RESPONSE = 5
+    FAILED = 6
+    BLOCKED = 7
+
+class ContactMethod(_LabeledIntEnum):
     """Method of contact"""
-    EMAIL = "email"
-    PHONE = "phone"
-    BOTH = "both"
+    EMAIL = 1
+    PHONE = 2
+    BOTH = 3
 
 class Property(Base):
     """Rental property model"""
@@ -60,25 +106,50 @@ class Property(Base):
     property_type = Column(String(50))  # apartment, house, studio
     address = Column(String(500))
     city = Column(String(100), nullable=False)
+    city_lc = Column(String(100), index=True)  # normalized city; equality probes can use the index
     postal_code = Column(String(10))
     neighborhood = Column(String(100))
     latitude = Column(Float)
     longitude = Column(Float)
     source_site = Column(String(50), nullable=False)  # seloger, leboncoin, etc.
     source_url = Column(String(1000), nullable=False, unique=True)
+    url_hash = Column(BigInteger, index=True)  # xxh64 of source_url; integer probes beat VARCHAR compares
     source_id = Column(String(100))
     features = Column(JSON)  # balcony, parking, elevator, etc.
     images = Column(JSON)  # list of image URLs
-    status = Column(SQLEnum(PropertyStatus), default=PropertyStatus.NEW)
+    _status = Column('status', SmallInteger, default=PropertyStatus.NEW)
     first_seen = Column(DateTime, default=datetime.utcnow)
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     still_available = Column(Boolean, default=True)
     duplicate_of = Column(Integer, ForeignKey('properties.id'), nullable=True)
     similarity_score = Column(Float)  # similarity to the original property
     
-    # Relationships
-    contacts = relationship("Contact", back_populates="property", cascade="all, delete-orphan")
-    communications = relationship("Communication", back_populates="property", cascade="all, delete-orphan")
+    # Covering indexes for the duplicate detector's candidate lookups and
+    # the dashboard/scheduler status scans
+    __table_args__ = (
+        Index('ix_properties_city_price_rooms', 'city', 'price', 'rooms'),
+        Index('ix_properties_city_price_available', 'city_lc', 'price', 'still_available'),
+        Index('ix_properties_status_available', 'status', 'still_available'),
+        Index('ix_properties_site_source_id', 'source_site', 'source_id'),
+    )
+    
+    # Relationships - passive_deletes lets SQLite's ON DELETE CASCADE
+    # remove children in one statement instead of the ORM loading and
+    # deleting every related row
+    contacts = relationship("Contact", back_populates="property", cascade="all, delete-orphan", passive_deletes=True)
+    communications = relationship("Communication", back_populates="property", cascade="all, delete-orphan", passive_deletes=True, order_by="Communication.sent_at.desc()")
+
+    @hybrid_property
+    def status(self):
+        return PropertyStatus(self._status) if self._status is not None else None
+
+    @status.setter
+    def status(self, value):
+        self._status = PropertyStatus(value) if value is not None else None
+
+    @status.expression
+    def status(cls):
+        return cls._status
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert property to dictionary"""
@@ -98,12 +169,18 @@ class Property(Base):
             'source_url': self.source_url,
             'features': self.features or {},
             'images': self.images or [],
-            'status': self.status.value if self.status else None,
+            'status': self.status.label if self.status else None,
             'first_seen': self.first_seen.isoformat() if self.first_seen else None,
             'last_updated': self.last_updated.isoformat() if self.last_updated else None,
             'still_available': self.still_available
         }
 
+@event.listens_for(Property, 'before_insert')
+@event.listens_for(Property, 'before_update')
+def _derive_city_lc(mapper, connection, target):
+    """Keep city_lc in sync for rows written through the ORM"""
+    target.city_lc = target.city.strip().lower() if target.city else None
+
 class Contact(Base):
     """Contact information for property agencies/owners"""
     __tablename__ = "contacts"
@@ -113,9 +190,9 @@ class Contact(Base):
     agency_name = Column(String(200))
     email = Column(String(200))
     phone = Column(String(20))
-    property_id = Column(Integer, ForeignKey('properties.id'), nullable=False)
-    status = Column(SQLEnum(ContactStatus), default=ContactStatus.PENDING)
-    preferred_method = Column(SQLEnum(ContactMethod), default=ContactMethod.EMAIL)
+    property_id = Column(Integer, ForeignKey('properties.id', ondelete='CASCADE'), nullable=False)
+    _status = Column('status', SmallInteger, default=ContactStatus.PENDING)
+    _preferred_method = Column('preferred_method', SmallInteger, default=ContactMethod.EMAIL)
     contact_attempts = Column(Integer, default=0)
     last_contact_attempt = Column(DateTime)
     next_contact_scheduled = Column(DateTime)
@@ -124,9 +201,39 @@ class Contact(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Covers the follow-up selector: status/responded equality, then
+    # range predicates on attempt time and count
+    __table_args__ = (
+        Index('ix_contacts_followup', 'status', 'responded', 'last_contact_attempt', 'contact_attempts'),
+    )
+    
     # Relationships
     property = relationship("Property", back_populates="contacts")
-    communications = relationship("Communication", back_populates="contact", cascade="all, delete-orphan")
+    communications = relationship("Communication", back_populates="contact", cascade="all, delete-orphan", passive_deletes=True)
+
+    @hybrid_property
+    def status(self):
+        return ContactStatus(self._status) if self._status is not None else None
+
+    @status.setter
+    def status(self, value):
+        self._status = ContactStatus(value) if value is not None else None
+
+    @status.expression
+    def status(cls):
+        return cls._status
+
+    @hybrid_property
+    def preferred_method(self):
+        return ContactMethod(self._preferred_method) if self._preferred_method is not None else None
+
+    @preferred_method.setter
+    def preferred_method(self, value):
+        self._preferred_method = ContactMethod(value) if value is not None else None
+
+    @preferred_method.expression
+    def preferred_method(cls):
+        return cls._preferred_method
     
     def schedule_follow_up(self, delay_hours: int = 24):
         """Schedule next contact attempt"""
@@ -141,8 +248,8 @@ class Contact(Base):
             'email': self.email,
             'phone': self.phone,
             'property_id': self.property_id,
-            'status': self.status.value if self.status else None,
-            'preferred_method': self.preferred_method.value if self.preferred_method else None,
+            'status': self.status.label if self.status else None,
+            'preferred_method': self.preferred_method.label if self.preferred_method else None,
             'contact_attempts': self.contact_attempts,
             'last_contact_attempt': self.last_contact_attempt.isoformat() if self.last_contact_attempt else None,
             'next_contact_scheduled': self.next_contact_scheduled.isoformat() if self.next_contact_scheduled else None,
@@ -155,23 +262,45 @@ class Communication(Base):
     __tablename__ = "communications"
     
     id = Column(Integer, primary_key=True)
-    property_id = Column(Integer, ForeignKey('properties.id'), nullable=False)
-    contact_id = Column(Integer, ForeignKey('contacts.id'), nullable=False)
-    method = Column(SQLEnum(ContactMethod), nullable=False)
+    property_id = Column(Integer, ForeignKey('properties.id', ondelete='CASCADE'), nullable=False)
+    contact_id = Column(Integer, ForeignKey('contacts.id', ondelete='CASCADE'), nullable=False)
+    _method = Column('method', SmallInteger, nullable=False)
     subject = Column(String(500))
     message = Column(Text)
+    template_name = Column(String(50))  # email template used, when applicable
+    context = Column(JSON)  # rendering context to rebuild the body on demand
     status = Column(String(50))  # sent, delivered, failed, responded
-    sent_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, server_default=func.now())
     delivered_at = Column(DateTime)
     response_received_at = Column(DateTime)
     response_subject = Column(String(500))
     response_message = Column(Text)
-    metadata = Column(JSON)  # additional data like email headers, call duration, etc.
+    call_sid = Column(String(64), index=True, nullable=True)  # Twilio call SID for webhook lookups
+    # 'metadata' is reserved on declarative classes, so the attribute is
+    # meta; the column name stays 'metadata' for existing databases
+    meta = Column('metadata', JSON)  # additional data like email headers, call duration, etc.
+    
+    # Covers the call-history query: filter on contact + method, order by sent_at
+    __table_args__ = (
+        Index('ix_communications_contact_method_sent', 'contact_id', 'method', 'sent_at'),
+    )
     
     # Relationships
     property = relationship("Property", back_populates="communications")
     contact = relationship("Contact", back_populates="communications")
 
+    @hybrid_property
+    def method(self):
+        return ContactMethod(self._method) if self._method is not None else None
+
+    @method.setter
+    def method(self, value):
+        self._method = ContactMethod(value) if value is not None else None
+
+    @method.expression
+    def method(cls):
+        return cls._method
+
 class ScrapingLog(Base):
     """Log of scraping activities"""
     __tablename__ = "scraping_logs"
@@ -187,20 +316,42 @@ class ScrapingLog(Base):
     status = Column(String(50))  # running, completed, failed
     error_message = Column(Text)
     search_criteria = Column(JSON)
-    metadata = Column(JSON)
+    meta = Column('metadata', JSON)
 
 def init_db():
     """Initialize database connection and create tables"""
     global engine, SessionLocal
     
-    config = Config()
+    config = get_config()
     engine = create_engine(
         config.DATABASE_URL,
         echo=config.DEBUG,
-        pool_pre_ping=True
+        # orjson handles the JSON columns (features, images, metadata);
+        # it is several times faster than stdlib json on bulk inserts
+        json_serializer=lambda value: orjson.dumps(value).decode(),
+        json_deserializer=orjson.loads,
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        pool_recycle=1800
     )
     
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    if config.DATABASE_URL.startswith('sqlite'):
+        # WAL lets readers run alongside the scraper's writer; the rest
+        # trades a little durability for far fewer fsyncs and more cache
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_conn, _record):
+            cursor = dbapi_conn.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA cache_size=-65536")
+            cursor.execute("PRAGMA mmap_size=268435456")
+            cursor.close()
+    
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
     Base.metadata.create_all(bind=engine)
 
 def get_db() -> Session:
@@ -212,6 +363,23 @@ def get_db() -> Session:
         db.close()
         raise
 
+@contextmanager
+def session_scope():
+    """Provide a transactional session scope
+
+    Commits on success, rolls back on error, and always closes the
+    session so pool slots are released on every exit path.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
 def close_db():
     """Close database connection"""
     if engine:
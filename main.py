@@ -16,10 +16,6 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from config.settings import Config
-from database.models import init_db
-from web.app import create_app
-from scrapers.scheduler import RentalScheduler
 from utils.logger import setup_logging
 
 def main():
@@ -30,12 +26,20 @@ def main():
     logger = logging.getLogger(__name__)
     
     logger.info("🏠 Starting French Real Estate Rental Hunter")
-    logger.info(f"📅 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info("📅 Started at: %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
     
     try:
+        # Imported here so Flask, SQLAlchemy and the scraper stack are
+        # only loaded when the app actually starts, and so import errors
+        # are reported through the logger instead of a bare traceback
+        from config.settings import get_config
+        from database.models import init_db
+        from web.app import create_app
+        from scrapers.scheduler import RentalScheduler
+        
         # Initialize configuration
-        config = Config()
-        logger.info(f"📋 Configuration loaded successfully")
+        config = get_config()
+        logger.info("📋 Configuration loaded successfully")
         
         # Initialize database
         init_db()
@@ -59,7 +63,7 @@ def main():
         port = int(os.environ.get('PORT', 5000))
         host = os.environ.get('HOST', '0.0.0.0')
         
-        logger.info(f"🚀 Starting web server on {host}:{port}")
+        logger.info("🚀 Starting web server on %s:%s", host, port)
         
         # Run Flask application
         app.run(
@@ -80,7 +84,7 @@ def main():
         logger.info("👋 French Real Estate Rental Hunter stopped")
         
     except Exception as e:
-        logger.error(f"💥 Application failed to start: {str(e)}", exc_info=True)
+        logger.error("💥 Application failed to start: %s", e, exc_info=True)
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -2,37 +2,80 @@
 Base scraper class for French rental sites
 """
 
+import asyncio
+import re
 import time
-import random
 import logging
 from abc import ABC, abstractmethod
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from urllib.parse import urljoin, urlparse
 
+import httpx
+import numpy as np
+import pandas as pd
 import requests
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
 from config.settings import Config, SearchCriteria
-from database.models import Property, PropertyStatus
+from database.models import Property, PropertyStatus, session_scope, url_hash64
 from utils.duplicate_detector import DuplicateDetector
 
 logger = logging.getLogger(__name__)
 
+# Keyword -> feature name, matched in one compiled-alternation scan over
+# the listing text instead of one substring search per keyword
+_FEATURE_KEYWORDS = {
+    'balcon': 'balcony', 'terrasse': 'balcony', 'loggia': 'balcony',
+    'parking': 'parking', 'garage': 'parking', 'stationnement': 'parking',
+    'ascenseur': 'elevator', 'lift': 'elevator',
+    'cave': 'cellar', 'cellier': 'cellar',
+    'jardin': 'garden', 'garden': 'garden',
+    'meublé': 'furnished', 'furnished': 'furnished',
+    'neuf': 'new', 'nouveau': 'new', 'récent': 'new',
+    'métro': 'metro', 'metro': 'metro', 'rer': 'metro', 'tramway': 'metro',
+    'école': 'school', 'school': 'school', 'université': 'school',
+    'commerce': 'shops', 'magasin': 'shops', 'shopping': 'shops',
+}
+_FEATURE_NAMES = ('balcony', 'parking', 'elevator', 'cellar', 'garden',
+                  'furnished', 'new', 'metro', 'school', 'shops')
+_FEATURE_RE = re.compile('|'.join(
+    re.escape(k) for k in sorted(_FEATURE_KEYWORDS, key=len, reverse=True)))
+
+# Numeric extraction patterns - C-level regex instead of per-char filters
+_NON_PRICE_RE = re.compile(r'[^\d.]+')
+_ROOM_RE = re.compile(r'studio|[tf]([1-5])|([1-5]) pièces?')
+_FIRST_DIGIT_RE = re.compile(r'\d')
+
 class BaseScraper(ABC):
     """Base class for all rental site scrapers"""
     
+    # How many request delays to sample per RNG batch
+    DELAY_BATCH_SIZE = 256
+    
     def __init__(self, config: Config):
         self.config = config
         self.session = requests.Session()
         self.duplicate_detector = DuplicateDetector(config)
         self.setup_session()
         
+        # Delays are sampled in batches - one vectorized draw replaces
+        # hundreds of per-request random.uniform calls
+        self._delay_rng = np.random.default_rng()
+        self._delays: List[float] = []
+        
+        # Shared async HTTP client, created on first async fetch
+        self._aclient: Optional[httpx.AsyncClient] = None
+        
+        # Shared Selenium driver for JS-rendered pages, started lazily
+        self._driver = None
+        
+        # Per-instance memo of search URLs - SearchCriteria is hashable,
+        # and pagination rebuilds the same URL for every page step
+        self._build_search_url_cached = lru_cache(maxsize=1024)(self._build_search_url_impl)
+        
     def setup_session(self):
         """Setup HTTP session with headers and configuration"""
         self.session.headers.update({
@@ -45,26 +88,62 @@ class BaseScraper(ABC):
             'Upgrade-Insecure-Requests': '1',
         })
         
-    def get_selenium_driver(self) -> webdriver.Chrome:
-        """Create and configure Selenium Chrome driver"""
+    def get_selenium_driver(self):
+        """Get the shared headless Chrome driver, starting it on first use
+        
+        Browser startup costs around a second per process; one long-lived
+        driver amortizes that over every JS-rendered page of a scrape run
+        instead of paying it per property. Images are disabled since only
+        the HTML is read. Selenium itself is imported here rather than at
+        module top - it pulls in dozens of submodules most scrape runs
+        never need.
+        """
+        if self._driver is not None:
+            return self._driver
+        
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
         options = Options()
         options.add_argument('--headless')
         options.add_argument('--no-sandbox')
         options.add_argument('--disable-dev-shm-usage')
         options.add_argument('--disable-gpu')
         options.add_argument('--window-size=1920,1080')
+        options.add_argument('--blink-settings=imagesEnabled=false')
         options.add_argument(f'--user-agent={self.config.USER_AGENT}')
         options.add_experimental_option('excludeSwitches', ['enable-logging'])
         options.add_experimental_option('useAutomationExtension', False)
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
         
         driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(15)
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        self._driver = driver
         return driver
         
+    def close_driver(self):
+        """Quit the shared Chrome driver, if one was started"""
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+        
+    def _next_delay(self) -> float:
+        """Pop the next precomputed request delay, refilling in batches"""
+        if not self._delays:
+            self._delays = self._delay_rng.uniform(
+                self.config.SCRAPING_DELAY_MIN,
+                self.config.SCRAPING_DELAY_MAX,
+                self.DELAY_BATCH_SIZE
+            ).tolist()
+        return self._delays.pop()
+        
     def random_delay(self):
         """Add random delay between requests"""
-        delay = random.uniform(self.config.SCRAPING_DELAY_MIN, self.config.SCRAPING_DELAY_MAX)
-        time.sleep(delay)
+        time.sleep(self._next_delay())
         
     def safe_get(self, url: str, **kwargs) -> Optional[requests.Response]:
         """Make safe HTTP request with error handling"""
@@ -74,87 +153,120 @@ class BaseScraper(ABC):
             response.raise_for_status()
             return response
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for {url}: {str(e)}")
+            logger.error("Request failed for %s: %s", url, e)
             return None
             
-    def parse_price(self, price_text: str) -> Optional[float]:
-        """Extract numeric price from text"""
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Lazily create the shared async HTTP client
+
+        One keep-alive pool serves every page and detail fetch, so TLS
+        handshakes are paid per host instead of per request.
+        """
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(
+                headers=dict(self.session.headers),
+                timeout=30,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+            )
+        return self._aclient
+        
+    async def aclose(self):
+        """Close the shared async HTTP client"""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+            
+    async def safe_get_async(self, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Async counterpart of safe_get - the delay yields to the loop"""
+        try:
+            await asyncio.sleep(self._next_delay())
+            response = await self._get_async_client().get(url, **kwargs)
+            response.raise_for_status()
+            return response
+        except httpx.HTTPError as e:
+            logger.error("Request failed for %s: %s", url, e)
+            return None
+            
+    @staticmethod
+    def parse_html(html) -> BeautifulSoup:
+        """Parse HTML with the C-backed lxml parser
+
+        html.parser walks the document in pure Python; lxml cuts parse
+        time by a large constant factor on full listing pages. Accepts
+        bytes as well as str - callers should pass response.content so
+        lxml sniffs the encoding itself instead of Python building a
+        decoded copy of the whole page first.
+        """
+        return BeautifulSoup(html, 'lxml')
+        
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def parse_price(price_text: str) -> Optional[float]:
+        """Extract numeric price from text
+        
+        Cached - price strings repeat heavily across listings and
+        pagination re-parses the same values.
+        """
         if not price_text:
             return None
             
-        # Remove common currency symbols and text
-        price_clean = price_text.replace('€', '').replace('EUR', '').replace(' ', '')
-        price_clean = price_clean.replace(',', '.').replace('CC', '').replace('charges', '')
-        price_clean = ''.join(filter(lambda x: x.isdigit() or x == '.', price_clean))
+        # Normalize the decimal separator, then strip everything non-numeric
+        price_clean = _NON_PRICE_RE.sub('', price_text.replace(',', '.'))
         
         try:
             return float(price_clean) if price_clean else None
         except ValueError:
             return None
             
-    def parse_area(self, area_text: str) -> Optional[float]:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def parse_area(area_text: str) -> Optional[float]:
         """Extract numeric area from text"""
         if not area_text:
             return None
             
-        # Extract numbers followed by m² or m2
-        area_clean = area_text.replace('m²', '').replace('m2', '').replace(' ', '')
-        area_clean = ''.join(filter(lambda x: x.isdigit() or x == '.', area_clean))
+        area_clean = _NON_PRICE_RE.sub('', area_text)
         
         try:
             return float(area_clean) if area_clean else None
         except ValueError:
             return None
             
-    def parse_rooms(self, rooms_text: str) -> Optional[int]:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def parse_rooms(rooms_text: str) -> Optional[int]:
         """Extract number of rooms from text"""
         if not rooms_text:
             return None
             
-        # Common French room descriptions
-        room_mappings = {
-            'studio': 1,
-            'T1': 1, 'F1': 1, '1 pièce': 1,
-            'T2': 2, 'F2': 2, '2 pièces': 2,
-            'T3': 3, 'F3': 3, '3 pièces': 3,
-            'T4': 4, 'F4': 4, '4 pièces': 4,
-            'T5': 5, 'F5': 5, '5 pièces': 5,
-        }
-        
-        rooms_lower = rooms_text.lower()
-        for key, value in room_mappings.items():
-            if key.lower() in rooms_lower:
-                return value
+        # Common French room descriptions (studio, T1-T5/F1-F5, "n pièces")
+        match = _ROOM_RE.search(rooms_text.lower())
+        if match:
+            digit = match.group(1) or match.group(2)
+            return int(digit) if digit else 1  # bare "studio"
                 
-        # Extract first number found
-        numbers = ''.join(filter(str.isdigit, rooms_text))
-        try:
-            return int(numbers[0]) if numbers else None
-        except (ValueError, IndexError):
-            return None
+        # Fall back to the first digit found
+        match = _FIRST_DIGIT_RE.search(rooms_text)
+        return int(match.group()) if match else None
             
     def extract_features(self, description: str, title: str = '') -> Dict[str, bool]:
-        """Extract property features from description and title"""
+        """Extract property features from description and title
+        
+        One linear scan with the combined keyword pattern replaces a
+        substring search per keyword (~30 passes over the same text).
+        """
         text = f"{title} {description}".lower()
         
-        features = {
-            'balcony': any(word in text for word in ['balcon', 'terrasse', 'loggia']),
-            'parking': any(word in text for word in ['parking', 'garage', 'stationnement']),
-            'elevator': any(word in text for word in ['ascenseur', 'lift']),
-            'cellar': any(word in text for word in ['cave', 'cellier']),
-            'garden': any(word in text for word in ['jardin', 'garden']),
-            'furnished': any(word in text for word in ['meublé', 'furnished']),
-            'new': any(word in text for word in ['neuf', 'nouveau', 'récent']),
-            'metro': any(word in text for word in ['métro', 'metro', 'rer', 'tramway']),
-            'school': any(word in text for word in ['école', 'school', 'université']),
-            'shops': any(word in text for word in ['commerce', 'magasin', 'shopping'])
-        }
+        features = dict.fromkeys(_FEATURE_NAMES, False)
+        for match in _FEATURE_RE.finditer(text):
+            features[_FEATURE_KEYWORDS[match.group()]] = True
         
         return features
         
     def build_search_url(self, criteria: SearchCriteria, city: str, page: int = 1) -> str:
         """Build search URL for the specific site"""
-        return self._build_search_url_impl(criteria, city, page)
+        return self._build_search_url_cached(criteria, city, page)
         
     @abstractmethod
     def _build_search_url_impl(self, criteria: SearchCriteria, city: str, page: int) -> str:
@@ -162,7 +274,7 @@ class BaseScraper(ABC):
         pass
         
     @abstractmethod
-    def parse_listing_page(self, html: str, search_criteria: SearchCriteria) -> List[Dict[str, Any]]:
+    def parse_listing_page(self, html: bytes, search_criteria: SearchCriteria) -> List[Dict[str, Any]]:
         """Parse a listing page and extract property information"""
         pass
         
@@ -176,9 +288,13 @@ class BaseScraper(ABC):
         """Extract contact information from property data"""
         pass
         
-    def scrape_city(self, city: str, criteria: SearchCriteria) -> List[Property]:
-        """Scrape all properties for a specific city"""
-        logger.info(f"🏙️ Starting to scrape {city} on {self.__class__.__name__}")
+    def scrape_city(self, city: str, criteria: SearchCriteria) -> List[Dict[str, Any]]:
+        """Scrape all properties for a specific city
+
+        Returns plain row dicts ready for save_properties(); callers
+        decide when to persist the batch.
+        """
+        logger.info("🏙️ Starting to scrape %s on %s", city, self.__class__.__name__)
         
         properties = []
         page = 1
@@ -187,80 +303,277 @@ class BaseScraper(ABC):
         while page <= max_pages:
             try:
                 search_url = self.build_search_url(criteria, city, page)
-                logger.debug(f"📄 Scraping page {page}: {search_url}")
+                logger.debug("📄 Scraping page %s: %s", page, search_url)
                 
                 response = self.safe_get(search_url)
                 if not response:
-                    logger.warning(f"Failed to get page {page} for {city}")
+                    logger.warning("Failed to get page %s for %s", page, city)
                     break
                     
-                page_properties = self.parse_listing_page(response.text, criteria)
+                page_properties = self.parse_listing_page(response.content, criteria)
                 
                 if not page_properties:
-                    logger.info(f"No more properties found on page {page}")
+                    logger.info("No more properties found on page %s", page)
                     break
                     
-                logger.info(f"📋 Found {len(page_properties)} properties on page {page}")
+                logger.info("📋 Found %s properties on page %s", len(page_properties), page)
                 
-                # Process each property
+                # Fetch details first, then normalize the page in one pass
                 for prop_data in page_properties:
                     try:
-                        # Get detailed information
                         detailed_data = self.get_property_details(prop_data.get('url', ''))
                         if detailed_data:
                             prop_data.update(detailed_data)
+                    except Exception as e:
+                        logger.error("Error fetching details for %s: %s", prop_data.get('url', ''), e)
+                        
+                parsed_fields = self.normalize_page_fields(page_properties)
+                
+                for prop_data, parsed in zip(page_properties, parsed_fields):
+                    try:
+                        # Build the property row
+                        row = self.create_property_from_data(prop_data, city, parsed=parsed)
+                        if row:
+                            properties.append(row)
                             
-                        # Create Property object
-                        property_obj = self.create_property_from_data(prop_data, city)
-                        if property_obj:
-                            properties.append(property_obj)
+                    except Exception as e:
+                        logger.error("Error processing property %s: %s", prop_data.get('url', ''), e)
+                        continue
+                        
+                page += 1
+                
+            except Exception as e:
+                logger.error("Error scraping page %s for %s: %s", page, city, e)
+                break
+                
+        logger.info("✅ Completed scraping %s: found %s properties", city, len(properties))
+        return properties
+        
+    def parse_prices_batch(self, texts: List[str]) -> List[Optional[float]]:
+        """Parse a page's worth of price strings in one vectorized pass"""
+        series = pd.Series(texts, dtype='object').fillna('')
+        cleaned = (series.str.replace(',', '.', regex=False)
+                         .str.replace(_NON_PRICE_RE, '', regex=True))
+        values = pd.to_numeric(cleaned, errors='coerce')
+        return [None if pd.isna(v) else float(v) for v in values]
+        
+    def parse_areas_batch(self, texts: List[str]) -> List[Optional[float]]:
+        """Parse a page's worth of area strings in one vectorized pass"""
+        series = pd.Series(texts, dtype='object').fillna('')
+        values = pd.to_numeric(series.str.replace(_NON_PRICE_RE, '', regex=True), errors='coerce')
+        return [None if pd.isna(v) else float(v) for v in values]
+        
+    def filter_listings(self, rows: List[Dict[str, Any]], criteria: SearchCriteria) -> List[Dict[str, Any]]:
+        """Filter a page of parsed listings against the search criteria
+        
+        Price and room bounds are evaluated over the whole page in one
+        vectorized pass; only the survivors run the per-listing keyword
+        and type checks in meets_criteria. NaN comparisons are false, so
+        listings whose numbers cannot be parsed pass the numeric
+        pre-filter just as they pass the scalar checks.
+        """
+        if not rows:
+            return []
+        
+        prices = self.parse_prices_batch([row.get('price', '') for row in rows])
+        rooms = [self.parse_rooms(row.get('rooms', '')) for row in rows]
+        
+        price_arr = np.array([np.nan if p is None else p for p in prices], dtype=np.float64)
+        room_arr = np.array([np.nan if r is None else r for r in rooms], dtype=np.float64)
+        
+        reject = ((price_arr < criteria.min_price) | (price_arr > criteria.max_price) |
+                  (room_arr < criteria.min_rooms) | (room_arr > criteria.max_rooms))
+        
+        return [
+            row for row, bad in zip(rows, reject)
+            if not bad and self.meets_criteria(row, criteria)
+        ]
+        
+    def normalize_page_fields(self, page_properties: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Normalize numeric fields for a whole page of listings at once
+        
+        Prices and areas go through one vectorized pandas pass instead of
+        a per-listing str.replace chain; rooms keep the per-string parser
+        since they are mapping-based.
+        """
+        prices = self.parse_prices_batch([p.get('price', '') for p in page_properties])
+        areas = self.parse_areas_batch([p.get('area', '') for p in page_properties])
+        return [
+            {
+                'price': price,
+                'area': area,
+                'rooms': self.parse_rooms(prop_data.get('rooms', ''))
+            }
+            for prop_data, price, area in zip(page_properties, prices, areas)
+        ]
+        
+    def _parse_property_details(self, html: bytes) -> Dict[str, Any]:
+        """Parse a property detail page (overridden by subclasses)"""
+        return {}
+        
+    async def get_property_details_async(self, property_url: str) -> Dict[str, Any]:
+        """Fetch and parse a property detail page without blocking"""
+        if not property_url:
+            return {}
+        response = await self.safe_get_async(property_url)
+        if not response:
+            return {}
+        try:
+            return self._parse_property_details(response.content)
+        except Exception as e:
+            logger.error("Error getting property details from %s: %s", property_url, e)
+            return {}
+            
+    async def scrape_city_async(self, city: str, criteria: SearchCriteria) -> List[Dict[str, Any]]:
+        """Async variant of scrape_city
+        
+        Listing pages are still fetched in order (pagination is
+        sequential by nature), but the detail pages of each listing page
+        are fetched concurrently under a politeness semaphore, so the
+        jittered delays overlap instead of adding up.
+        """
+        logger.info("🏙️ Starting to scrape %s on %s", city, self.__class__.__name__)
+        
+        semaphore = asyncio.Semaphore(8)
+        
+        async def _details(prop_data):
+            async with semaphore:
+                return await self.get_property_details_async(prop_data.get('url', ''))
+        
+        properties = []
+        page = 1
+        max_pages = 10  # Limit to prevent infinite loops
+        
+        while page <= max_pages:
+            try:
+                search_url = self.build_search_url(criteria, city, page)
+                logger.debug("📄 Scraping page %s: %s", page, search_url)
+                
+                response = await self.safe_get_async(search_url)
+                if not response:
+                    logger.warning("Failed to get page %s for %s", page, city)
+                    break
+                    
+                page_properties = self.parse_listing_page(response.content, criteria)
+                
+                if not page_properties:
+                    logger.info("No more properties found on page %s", page)
+                    break
+                    
+                logger.info("📋 Found %s properties on page %s", len(page_properties), page)
+                
+                # Fetch all detail pages of this listing page concurrently
+                details = await asyncio.gather(
+                    *[_details(prop_data) for prop_data in page_properties],
+                    return_exceptions=True
+                )
+                
+                for prop_data, detailed_data in zip(page_properties, details):
+                    if isinstance(detailed_data, dict) and detailed_data:
+                        prop_data.update(detailed_data)
+                        
+                parsed_fields = self.normalize_page_fields(page_properties)
+                
+                for prop_data, parsed in zip(page_properties, parsed_fields):
+                    try:
+                        row = self.create_property_from_data(prop_data, city, parsed=parsed)
+                        if row:
+                            properties.append(row)
                             
                     except Exception as e:
-                        logger.error(f"Error processing property {prop_data.get('url', '')}: {str(e)}")
+                        logger.error("Error processing property %s: %s", prop_data.get('url', ''), e)
                         continue
                         
                 page += 1
                 
             except Exception as e:
-                logger.error(f"Error scraping page {page} for {city}: {str(e)}")
+                logger.error("Error scraping page %s for %s: %s", page, city, e)
                 break
                 
-        logger.info(f"✅ Completed scraping {city}: found {len(properties)} properties")
+        logger.info("✅ Completed scraping %s: found %s properties", city, len(properties))
         return properties
         
-    def create_property_from_data(self, data: Dict[str, Any], city: str) -> Optional[Property]:
-        """Create Property object from scraped data"""
+    def create_property_from_data(self, data: Dict[str, Any], city: str, parsed: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Build a property row dict from scraped data
+        
+        parsed optionally carries price/rooms/area already normalized by
+        normalize_page_fields, skipping the per-listing parsers.
+        """
         try:
             # Check for duplicate
             if self.duplicate_detector.is_duplicate(data):
-                logger.debug(f"Skipping duplicate property: {data.get('url', '')}")
+                logger.debug("Skipping duplicate property: %s", data.get('url', ''))
                 return None
                 
-            property_obj = Property(
-                title=data.get('title', ''),
-                description=data.get('description', ''),
-                price=self.parse_price(data.get('price', '')),
-                rooms=self.parse_rooms(data.get('rooms', '')),
-                area=self.parse_area(data.get('area', '')),
-                property_type=data.get('property_type', ''),
-                address=data.get('address', ''),
-                city=city,
-                postal_code=data.get('postal_code', ''),
-                neighborhood=data.get('neighborhood', ''),
-                source_site=self.__class__.__name__.lower().replace('scraper', ''),
-                source_url=data.get('url', ''),
-                source_id=data.get('id', ''),
-                features=self.extract_features(data.get('description', ''), data.get('title', '')),
-                images=data.get('images', []),
-                status=PropertyStatus.NEW
-            )
-            
-            return property_obj
+            if parsed is None:
+                parsed = {
+                    'price': self.parse_price(data.get('price', '')),
+                    'rooms': self.parse_rooms(data.get('rooms', '')),
+                    'area': self.parse_area(data.get('area', ''))
+                }
+                
+            return {
+                'title': data.get('title', ''),
+                'description': data.get('description', ''),
+                'price': parsed['price'],
+                'rooms': parsed['rooms'],
+                'area': parsed['area'],
+                'property_type': data.get('property_type', ''),
+                'address': data.get('address', ''),
+                'city': city,
+                # Set here too because the bulk Core upsert bypasses the
+                # ORM listener that derives it
+                'city_lc': city.strip().lower(),
+                'postal_code': data.get('postal_code', ''),
+                'neighborhood': data.get('neighborhood', ''),
+                'source_site': self.get_site_name(),
+                'source_url': data.get('url', ''),
+                'url_hash': url_hash64(data.get('url', '')),
+                'source_id': data.get('id', ''),
+                'features': self.extract_features(data.get('description', ''), data.get('title', '')),
+                'images': data.get('images', []),
+                'status': PropertyStatus.NEW
+            }
             
         except Exception as e:
-            logger.error(f"Error creating property from data: {str(e)}")
+            logger.error("Error creating property from data: %s", e)
             return None
             
+    def save_properties(self, rows: List[Dict[str, Any]], chunk_size: int = 500) -> int:
+        """Upsert scraped rows in bulk, returning how many were new
+
+        One multi-row INSERT .. ON CONFLICT per chunk replaces the
+        per-property SELECT + INSERT round-trips; source_url uniqueness
+        handles refresh-vs-insert server-side. Existing rows get their
+        price, availability and last_updated refreshed.
+        """
+        if not rows:
+            return 0
+            
+        new_count = 0
+        with session_scope() as db:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                hashes = [row['url_hash'] for row in chunk]
+                existing = {
+                    h for (h,) in
+                    db.query(Property.url_hash).filter(Property.url_hash.in_(hashes))
+                }
+                new_count += sum(1 for h in hashes if h not in existing)
+                
+                stmt = sqlite_insert(Property.__table__).values(chunk)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['source_url'],
+                    set_={
+                        'price': stmt.excluded.price,
+                        'still_available': True,
+                        'last_updated': datetime.utcnow()
+                    }
+                )
+                db.execute(stmt)
+                
+        return new_count
+            
     def get_site_name(self) -> str:
         """Get the name of the scraping site"""
-        return self.__class__.__name__.lower().replace('scraper', '')
\ No newline at end of file
+        return self.__class__.__name__.lower().replace('scraper', '')
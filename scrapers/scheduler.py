@@ -2,15 +2,24 @@
 Background task scheduler for French Real Estate Rental Hunter
 """
 
+import asyncio
+import contextlib
+import itertools
 import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from cachetools import TTLCache
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 
-from config.settings import Config
+from config.settings import Config, SearchCriteria
+
 from database.models import get_db, Property, Contact, ScrapingLog, ContactStatus, PropertyStatus
 from scrapers.seloger_scraper import SeLogerScraper
 from communication.email_sender import EmailSender
@@ -18,12 +27,68 @@ from communication.phone_caller import PhoneCaller
 
 logger = logging.getLogger(__name__)
 
+# Duplicate detector reused across tasks within one worker process -
+# ProcessPoolExecutor workers outlive individual tasks, so the MinHash
+# index over existing listings is built once per worker, not once per
+# (site, city) task
+_worker_detector = None
+
+def _scrape_one(site_name: str, city: str, criteria: SearchCriteria) -> List[Dict[str, Any]]:
+    """Scrape one (site, city) pair inside a worker process
+
+    Lives at module level so ProcessPoolExecutor can pickle it. Each
+    worker builds its own scraper and database connection - processes
+    share nothing - and returns plain row dicts, so only cheap picklable
+    data crosses the pipe back to the parent. Inside the worker the
+    async scrape path runs under asyncio.run, so detail pages for a
+    city are fetched concurrently over the scraper's pooled client
+    instead of one blocking request per listing.
+    """
+    from config.settings import get_config
+    from database import models
+    from scrapers.seloger_scraper import SeLogerScraper
+
+    if models.SessionLocal is None:
+        models.init_db()
+
+    scraper_classes = {'seloger': SeLogerScraper}
+    scraper = scraper_classes[site_name](get_config())
+
+    global _worker_detector
+    if _worker_detector is None:
+        _worker_detector = scraper.duplicate_detector
+    else:
+        scraper.duplicate_detector = _worker_detector
+
+    async def _run():
+        try:
+            return await scraper.scrape_city_async(city, criteria)
+        finally:
+            await scraper.aclose()
+
+    try:
+        return asyncio.run(_run())
+    finally:
+        scraper.close_driver()
+
 class RentalScheduler:
     """Manages scheduled tasks for rental property hunting"""
     
+    # First back-off step when scrape runs keep coming up empty
+    BACKOFF_BASE_HOURS = 6
+    
     def __init__(self, config: Config):
         self.config = config
-        self.scheduler = BackgroundScheduler(timezone='Europe/Paris')
+        # Shared defaults: missed fires coalesce into one run and are
+        # still honoured within a grace window rather than dropped
+        self.scheduler = BackgroundScheduler(
+            timezone='Europe/Paris',
+            job_defaults={
+                'coalesce': True,
+                'max_instances': 1,
+                'misfire_grace_time': 900  # 15 minutes
+            }
+        )
         self.email_sender = EmailSender(config)
         self.phone_caller = PhoneCaller(config)
         
@@ -32,6 +97,16 @@ class RentalScheduler:
             'seloger': SeLogerScraper(config)
         }
         
+        # URLs upserted within the last hour - consecutive runs mostly
+        # re-encounter the same listings, and rows whose URL is here can
+        # skip the database entirely. Locked because APScheduler may run
+        # jobs from its own thread pool.
+        self._seen_urls = TTLCache(maxsize=200_000, ttl=3600)
+        self._seen_urls_lock = threading.Lock()
+        
+        # Consecutive scrape runs that found nothing new
+        self._empty_runs = 0
+        
         # Add event listeners
         self.scheduler.add_listener(self._job_executed_listener, EVENT_JOB_EXECUTED)
         self.scheduler.add_listener(self._job_error_listener, EVENT_JOB_ERROR)
@@ -45,7 +120,7 @@ class RentalScheduler:
             self.scheduler.start()
             logger.info("✅ Scheduler started successfully")
         except Exception as e:
-            logger.error(f"❌ Failed to start scheduler: {str(e)}")
+            logger.error("❌ Failed to start scheduler: %s", e)
             
     def stop(self):
         """Stop the scheduler"""
@@ -53,7 +128,7 @@ class RentalScheduler:
             self.scheduler.shutdown()
             logger.info("🛑 Scheduler stopped")
         except Exception as e:
-            logger.error(f"Error stopping scheduler: {str(e)}")
+            logger.error("Error stopping scheduler: %s", e)
             
     def _schedule_jobs(self):
         """Schedule all background jobs"""
@@ -65,10 +140,10 @@ class RentalScheduler:
                 trigger=CronTrigger.from_crontab(self.config.SCRAPING_SCHEDULE),
                 id='scrape_properties',
                 name='Scrape rental properties',
-                max_instances=1,
-                misfire_grace_time=600  # 10 minutes
+                replace_existing=True,
+                misfire_grace_time=3600  # scrape runs are long; 1 hour
             )
-            logger.info(f"📅 Scheduled scraping: {self.config.SCRAPING_SCHEDULE}")
+            logger.info("📅 Scheduled scraping: %s", self.config.SCRAPING_SCHEDULE)
         
         # Contact initiation job
         if self.config.CONTACT_SCHEDULE:
@@ -77,10 +152,9 @@ class RentalScheduler:
                 trigger=CronTrigger.from_crontab(self.config.CONTACT_SCHEDULE),
                 id='initiate_contacts',
                 name='Initiate new contacts',
-                max_instances=1,
-                misfire_grace_time=300  # 5 minutes
+                replace_existing=True
             )
-            logger.info(f"📅 Scheduled contact initiation: {self.config.CONTACT_SCHEDULE}")
+            logger.info("📅 Scheduled contact initiation: %s", self.config.CONTACT_SCHEDULE)
         
         # Follow-up job
         if self.config.FOLLOW_UP_SCHEDULE:
@@ -89,10 +163,9 @@ class RentalScheduler:
                 trigger=CronTrigger.from_crontab(self.config.FOLLOW_UP_SCHEDULE),
                 id='send_follow_ups',
                 name='Send follow-up communications',
-                max_instances=1,
-                misfire_grace_time=300  # 5 minutes
+                replace_existing=True
             )
-            logger.info(f"📅 Scheduled follow-ups: {self.config.FOLLOW_UP_SCHEDULE}")
+            logger.info("📅 Scheduled follow-ups: %s", self.config.FOLLOW_UP_SCHEDULE)
         
         # Daily cleanup job
         self.scheduler.add_job(
@@ -100,96 +173,135 @@ class RentalScheduler:
             trigger=CronTrigger(hour=2, minute=0),  # 2 AM daily
             id='daily_cleanup',
             name='Daily database cleanup',
-            max_instances=1
+            replace_existing=True
         )
         logger.info("📅 Scheduled daily cleanup: 02:00")
         
     def scrape_all_sites(self):
-        """Scrape all enabled sites for all configured cities"""
+        """Scrape all enabled sites for all configured cities
+        
+        Each (site, city) pair runs in its own worker process: fetching
+        is IO-bound but HTML parsing is CPU-bound, and separate
+        processes let parsing use every core instead of serializing on
+        one GIL. Workers return plain row dicts; all database writes
+        stay in the parent.
+        """
         logger.info("🚀 Starting scheduled scraping of all sites")
         
+        criteria = self.config.DEFAULT_SEARCH_CRITERIA
+        combos = [
+            (site_name, city.strip())
+            for city in criteria.cities if city.strip()
+            for site_name in self.scrapers
+            if self.config.ENABLED_SCRAPERS.get(site_name, False)
+        ]
+        
         total_properties = 0
         total_new = 0
         
-        for city in self.config.DEFAULT_SEARCH_CRITERIA.cities:
-            city = city.strip()
-            if not city:
-                continue
-                
-            logger.info(f"🏙️ Scraping properties in {city}")
+        # One session serves the whole run, and log rows are buffered as
+        # plain dicts until the end - the transient 'running' state only
+        # ever cost two extra commits per (site, city) pair
+        with contextlib.closing(get_db()) as db, \
+                ProcessPoolExecutor(max_workers=self.config.MAX_CONCURRENT_SCRAPERS) as executor:
+            futures = {}
+            logs = {}
+            for site_name, city in combos:
+                future = executor.submit(_scrape_one, site_name, city, criteria)
+                futures[future] = (site_name, city)
+                # Every row carries the full key set - executemany
+                # binds parameters from the first row, so completed and
+                # failed rows must not diverge in shape
+                logs[future] = {
+                    'site': site_name,
+                    'started_at': datetime.utcnow(),
+                    'completed_at': None,
+                    'status': 'running',
+                    'properties_found': 0,
+                    'properties_new': 0,
+                    'error_message': None,
+                    'search_criteria': {
+                        'city': city,
+                        'criteria': asdict(criteria)
+                    }
+                }
             
-            for site_name, scraper in self.scrapers.items():
-                if not self.config.ENABLED_SCRAPERS.get(site_name, False):
-                    logger.debug(f"Skipping disabled scraper: {site_name}")
-                    continue
-                    
+            for future in as_completed(futures):
+                site_name, city = futures[future]
+                log_row = logs[future]
                 try:
-                    # Create scraping log
-                    scraping_log = ScrapingLog(
-                        site=site_name,
-                        started_at=datetime.utcnow(),
-                        status='running',
-                        search_criteria={
-                            'city': city,
-                            'criteria': self.config.DEFAULT_SEARCH_CRITERIA.__dict__
-                        }
-                    )
-                    
-                    db = get_db()
-                    db.add(scraping_log)
-                    db.commit()
+                    properties = future.result()
                     
-                    # Scrape properties
-                    properties = scraper.scrape_city(city, self.config.DEFAULT_SEARCH_CRITERIA)
+                    # Drop rows upserted within the TTL window, then save
+                    # the remainder in one bulk upsert
+                    with self._seen_urls_lock:
+                        fresh_rows = [row for row in properties
+                                      if row['source_url'] not in self._seen_urls]
+                    new_count = self.scrapers[site_name].save_properties(fresh_rows)
+                    with self._seen_urls_lock:
+                        for row in fresh_rows:
+                            self._seen_urls[row['source_url']] = True
                     
-                    # Save properties to database
-                    new_count = 0
-                    for prop in properties:
-                        try:
-                            # Check if property already exists
-                            existing = db.query(Property).filter(
-                                Property.source_url == prop.source_url
-                            ).first()
-                            
-                            if not existing:
-                                db.add(prop)
-                                new_count += 1
-                            else:
-                                # Update existing property
-                                existing.last_updated = datetime.utcnow()
-                                existing.still_available = True
-                        except Exception as e:
-                            logger.error(f"Error saving property: {str(e)}")
-                            continue
-                    
-                    db.commit()
-                    
-                    # Update scraping log
-                    scraping_log.completed_at = datetime.utcnow()
-                    scraping_log.status = 'completed'
-                    scraping_log.properties_found = len(properties)
-                    scraping_log.properties_new = new_count
-                    db.commit()
+                    log_row.update(
+                        completed_at=datetime.utcnow(),
+                        status='completed',
+                        properties_found=len(properties),
+                        properties_new=new_count
+                    )
                     
                     total_properties += len(properties)
                     total_new += new_count
                     
-                    logger.info(f"✅ {site_name} - {city}: {len(properties)} found, {new_count} new")
+                    logger.info("✅ %s - %s: %s found, %s new", site_name, city, len(properties), new_count)
                     
                 except Exception as e:
-                    logger.error(f"❌ Error scraping {site_name} for {city}: {str(e)}")
+                    logger.error("❌ Error scraping %s for %s: %s", site_name, city, e)
                     
-                    if 'scraping_log' in locals():
-                        scraping_log.completed_at = datetime.utcnow()
-                        scraping_log.status = 'failed'
-                        scraping_log.error_message = str(e)
-                        db.commit()
-                        
-                finally:
-                    if 'db' in locals():
-                        db.close()
+                    log_row.update(
+                        completed_at=datetime.utcnow(),
+                        status='failed',
+                        error_message=str(e)
+                    )
+            
+            # One bulk insert covers every unit's final record
+            if logs:
+                db.execute(ScrapingLog.__table__.insert(), list(logs.values()))
+                db.commit()
+        
+        logger.info("🎉 Scraping completed: %s total properties, %s new", total_properties, total_new)
         
-        logger.info(f"🎉 Scraping completed: {total_properties} total properties, {total_new} new")
+        self._adjust_scrape_cadence(total_new)
+        
+    def _adjust_scrape_cadence(self, total_new: int):
+        """Back off the scraping cadence while runs come back empty
+        
+        Each empty run doubles the interval, capped at a day; the first
+        run that finds something puts the job back on its configured
+        cron schedule. Saves scraper and database work when the market
+        is quiet without ever fully stopping.
+        """
+        if not self.config.SCRAPING_SCHEDULE:
+            return
+        
+        try:
+            if total_new > 0:
+                if self._empty_runs:
+                    self._empty_runs = 0
+                    self.scheduler.reschedule_job(
+                        'scrape_properties',
+                        trigger=CronTrigger.from_crontab(self.config.SCRAPING_SCHEDULE)
+                    )
+                    logger.info("⏰ New properties found - scraping back on its regular schedule")
+            else:
+                self._empty_runs += 1
+                hours = min(24, self.BACKOFF_BASE_HOURS * 2 ** (self._empty_runs - 1))
+                self.scheduler.reschedule_job(
+                    'scrape_properties',
+                    trigger=IntervalTrigger(hours=hours)
+                )
+                logger.info("⏰ No new properties for %s runs - next scrape in %sh", self._empty_runs, hours)
+        except Exception as e:
+            logger.error("Error adjusting scrape cadence: %s", e)
         
     def initiate_contacts(self):
         """Initiate contact for new properties"""
@@ -232,14 +344,14 @@ class RentalScheduler:
                         contacted_count += 1
                     
                 except Exception as e:
-                    logger.error(f"Error initiating contact for property {property_obj.id}: {str(e)}")
+                    logger.error("Error initiating contact for property %s: %s", property_obj.id, e)
                     continue
             
             db.commit()
-            logger.info(f"✅ Contact initiation completed: {contacted_count} properties contacted")
+            logger.info("✅ Contact initiation completed: %s properties contacted", contacted_count)
             
         except Exception as e:
-            logger.error(f"❌ Error in contact initiation: {str(e)}")
+            logger.error("❌ Error in contact initiation: %s", e)
         finally:
             if 'db' in locals():
                 db.close()
@@ -254,46 +366,90 @@ class RentalScheduler:
             # Get contacts that need follow-up
             follow_up_time = datetime.utcnow() - timedelta(hours=self.config.FOLLOW_UP_DELAY_HOURS)
             
+            # yield_per streams the result set in fixed-size batches
+            # instead of materializing every due contact up front
             contacts_to_follow_up = db.query(Contact).filter(
                 Contact.status.in_([ContactStatus.EMAIL_SENT, ContactStatus.PHONE_CALLED]),
                 Contact.responded == False,
                 Contact.last_contact_attempt < follow_up_time,
                 Contact.contact_attempts < self.config.MAX_CONTACT_ATTEMPTS
-            ).all()
+            ).yield_per(500)
             
-            follow_up_count = 0
+            # Each send is an independent network call, so the whole
+            # batch runs on one event loop with bounded concurrency
+            follow_up_count = asyncio.run(
+                self._send_follow_ups_async(contacts_to_follow_up))
             
-            for contact in contacts_to_follow_up:
+            db.commit()
+            logger.info("✅ Follow-up completed: %s follow-ups sent", follow_up_count)
+            
+        except Exception as e:
+            logger.error("❌ Error in follow-up process: %s", e)
+        finally:
+            if 'db' in locals():
+                db.close()
+    
+    async def _send_follow_ups_async(self, contacts, concurrency: int = 10) -> int:
+        """Send due follow-ups concurrently and return the success count
+        
+        SMTP dialogs and Twilio API calls are round-trip dominated, so
+        overlapping them under a semaphore turns N serial waits into
+        roughly N / concurrency. ORM updates happen inline after each
+        send - the loop runs in the job's own thread, so the session is
+        never touched from anywhere else.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _send_one(contact: Contact) -> bool:
+            async with semaphore:
                 try:
                     # Determine next contact method
                     if contact.contact_attempts == 0:
                         # First attempt - email
-                        success = self.email_sender.send_follow_up_email(contact)
+                        send_async = self.email_sender.send_follow_up_email_async
+                        send_sync = self.email_sender.send_follow_up_email
                     elif contact.contact_attempts == 1:
                         # Second attempt - phone call
-                        success = self.phone_caller.make_follow_up_call(contact)
+                        send_async = self.phone_caller.make_follow_up_call_async
+                        send_sync = self.phone_caller.make_follow_up_call
                     else:
                         # Final attempt - email with urgency
-                        success = self.email_sender.send_urgent_follow_up_email(contact)
-                    
-                    if success:
-                        contact.contact_attempts += 1
-                        contact.last_contact_attempt = datetime.utcnow()
-                        contact.schedule_follow_up(self.config.FOLLOW_UP_DELAY_HOURS)
-                        follow_up_count += 1
+                        send_async = self.email_sender.send_urgent_follow_up_email_async
+                        send_sync = self.email_sender.send_urgent_follow_up_email
                     
+                    success = await send_async(contact)
+                    if not success:
+                        # A failure in the async stack must not silently
+                        # drop the follow-up - retry over the proven
+                        # sync sender off the event loop
+                        success = await asyncio.to_thread(send_sync, contact)
                 except Exception as e:
-                    logger.error(f"Error in follow-up for contact {contact.id}: {str(e)}")
-                    continue
+                    logger.error("Error in follow-up for contact %s: %s", contact.id, e)
+                    return False
             
-            db.commit()
-            logger.info(f"✅ Follow-up completed: {follow_up_count} follow-ups sent")
-            
-        except Exception as e:
-            logger.error(f"❌ Error in follow-up process: {str(e)}")
+            if success:
+                contact.contact_attempts += 1
+                contact.last_contact_attempt = datetime.utcnow()
+                contact.schedule_follow_up(self.config.FOLLOW_UP_DELAY_HOURS)
+            return success
+        
+        sent = 0
+        try:
+            # Gather in windows matching the query's yield_per, so the
+            # streamed result set is never fully materialized here
+            contacts_iter = iter(contacts)
+            while True:
+                window = list(itertools.islice(contacts_iter, 500))
+                if not window:
+                    break
+                results = await asyncio.gather(
+                    *(_send_one(contact) for contact in window))
+                sent += sum(1 for ok in results if ok)
         finally:
-            if 'db' in locals():
-                db.close()
+            # The shared Twilio client is bound to this loop, so it
+            # cannot outlive the run
+            await self.phone_caller.aclose()
+        return sent
     
     def daily_cleanup(self):
         """Perform daily database cleanup tasks"""
@@ -309,24 +465,22 @@ class RentalScheduler:
                 Property.still_available == True
             )
             
-            old_count = old_properties.count()
-            old_properties.update({Property.still_available: False})
+            # The UPDATE/DELETE rowcounts replace the former SELECT
+            # COUNT(*) pre-queries, which doubled the statement count
+            old_count = old_properties.update({Property.still_available: False}, synchronize_session=False)
             
             # Clean up old scraping logs (keep last 30 days)
             old_logs_threshold = datetime.utcnow() - timedelta(days=30)
-            old_logs = db.query(ScrapingLog).filter(
+            logs_count = db.query(ScrapingLog).filter(
                 ScrapingLog.started_at < old_logs_threshold
-            )
-            
-            logs_count = old_logs.count()
-            old_logs.delete()
+            ).delete(synchronize_session=False)
             
             db.commit()
             
-            logger.info(f"✅ Cleanup completed: {old_count} properties marked unavailable, {logs_count} old logs removed")
+            logger.info("✅ Cleanup completed: %s properties marked unavailable, %s old logs removed", old_count, logs_count)
             
         except Exception as e:
-            logger.error(f"❌ Error in daily cleanup: {str(e)}")
+            logger.error("❌ Error in daily cleanup: %s", e)
         finally:
             if 'db' in locals():
                 db.close()
@@ -335,13 +489,13 @@ class RentalScheduler:
         """Handle job execution events"""
         job = self.scheduler.get_job(event.job_id)
         if job:
-            logger.info(f"✅ Job '{job.name}' executed successfully")
+            logger.info("✅ Job '%s' executed successfully", job.name)
     
     def _job_error_listener(self, event):
         """Handle job error events"""
         job = self.scheduler.get_job(event.job_id)
         if job:
-            logger.error(f"❌ Job '{job.name}' failed: {event.exception}")
+            logger.error("❌ Job '%s' failed: %s", job.name, event.exception)
     
     def get_job_status(self) -> Dict[str, Any]:
         """Get status of all scheduled jobs"""
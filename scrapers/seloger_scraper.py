@@ -3,8 +3,12 @@ SeLoger.com scraper for French rental properties
 """
 
 import logging
-from typing import List, Dict, Any
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 from urllib.parse import urlencode, urljoin
+
+import soupsieve as sv
 from bs4 import BeautifulSoup
 
 from config.settings import SearchCriteria
@@ -12,6 +16,55 @@ from scrapers.base_scraper import BaseScraper
 
 logger = logging.getLogger(__name__)
 
+# Selectors compiled once at import - soupsieve otherwise re-parses the
+# selector string on every find call, and the text= lambdas below them
+# replaced interpreted per-node Python predicates
+_SEL_LISTING = sv.compile('article.c-pa-list')
+_SEL_LISTING_ALT = sv.compile('div[data-listing-id]')
+_SEL_TITLE = sv.compile('h2.c-pa-list-title, a.c-pa-link')
+_SEL_PRICE = sv.compile('span.c-pa-price, div.c-pa-criterion--price')
+_SEL_ROOMS = sv.compile('li.c-pa-criterion--room')
+_SEL_AREA = sv.compile('li.c-pa-criterion--surface')
+_SEL_LOCATION = sv.compile('div.c-pa-city, span.c-pa-list-city')
+_SEL_DESCRIPTION = sv.compile('div.c-pa-description, section.description')
+_SEL_FEATURES = sv.compile('li.criterion-item')
+_SEL_FEATURES_ALT = sv.compile('div.c-pa-criterion')
+_SEL_GALLERY = sv.compile('div.c-pa-gallery, div.slider-container')
+_SEL_AGENCY = sv.compile('div.c-pa-agency-name, span.agency-name')
+_SEL_PHONE = sv.compile('span[data-phone], button.phone-button')
+_SEL_CONTACT_FORM = sv.compile('form.contact-form, div.contact-email')
+_SEL_AGENT = sv.compile('div.agent-name, span.c-pa-agent')
+
+# Compiled text probes for listings without the usual classes
+_ROOM_TEXT_RE = re.compile(r'pièce|T')
+_AREA_TEXT_RE = re.compile('m²')
+
+# Single-scan extractors for postal codes and the listing id in a URL
+_POSTAL_RE = re.compile(r'\b(\d{5})\b')
+_ID_RE = re.compile(r'/(\d+)(?:/|$|\?)')
+
+@lru_cache(maxsize=32)
+def _lowered(words: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Lowercase a criteria keyword tuple once per distinct criteria"""
+    return tuple(word.lower() for word in words)
+
+@lru_cache(maxsize=32)
+def _lowered_set(words: Tuple[str, ...]) -> frozenset:
+    """Lowercased criteria values as a frozenset for membership tests"""
+    return frozenset(word.lower() for word in words)
+
+@lru_cache(maxsize=32)
+def _keyword_re(words: Tuple[str, ...]):
+    """Compiled alternation matching any criteria keyword in one scan
+    
+    Built once per distinct keyword tuple; longest-first so overlapping
+    keywords match their most specific form.
+    """
+    if not words:
+        return None
+    return re.compile('|'.join(
+        re.escape(word) for word in sorted(_lowered(words), key=len, reverse=True)))
+
 class SeLogerScraper(BaseScraper):
     """Scraper for SeLoger.com rental listings"""
     
@@ -51,37 +104,38 @@ class SeLogerScraper(BaseScraper):
         query_string = urlencode(params, safe='/')
         return f"{self.BASE_URL}{search_path}?{query_string}"
     
-    def parse_listing_page(self, html: str, search_criteria: SearchCriteria) -> List[Dict[str, Any]]:
+    def parse_listing_page(self, html: bytes, search_criteria: SearchCriteria) -> List[Dict[str, Any]]:
         """Parse SeLoger listing page"""
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = self.parse_html(html)
         properties = []
         
         # Find property listings
-        listings = soup.find_all('article', class_='c-pa-list')
+        listings = _SEL_LISTING.select(soup)
         
         if not listings:
             # Try alternative selectors
-            listings = soup.find_all('div', {'data-listing-id': True})
+            listings = _SEL_LISTING_ALT.select(soup)
         
-        logger.debug(f"Found {len(listings)} listings on page")
+        logger.debug("Found %s listings on page", len(listings))
         
         for listing in listings:
             try:
                 property_data = self.parse_single_listing(listing)
-                if property_data and self.meets_criteria(property_data, search_criteria):
+                if property_data:
                     properties.append(property_data)
             except Exception as e:
-                logger.error(f"Error parsing listing: {str(e)}")
+                logger.error("Error parsing listing: %s", e)
                 continue
         
-        return properties
+        # Criteria filtering runs over the whole page at once
+        return self.filter_listings(properties, search_criteria)
     
     def parse_single_listing(self, listing) -> Dict[str, Any]:
         """Parse a single property listing"""
         data = {}
         
         # Title
-        title_elem = listing.find('h2', class_='c-pa-list-title') or listing.find('a', class_='c-pa-link')
+        title_elem = _SEL_TITLE.select_one(listing)
         if title_elem:
             data['title'] = title_elem.get_text(strip=True)
             
@@ -91,32 +145,30 @@ class SeLogerScraper(BaseScraper):
                 data['url'] = urljoin(self.BASE_URL, link['href'])
         
         # Price
-        price_elem = listing.find('span', class_='c-pa-price') or listing.find('div', class_='c-pa-criterion--price')
+        price_elem = _SEL_PRICE.select_one(listing)
         if price_elem:
             data['price'] = price_elem.get_text(strip=True)
         
         # Room information
-        rooms_elem = listing.find('li', class_='c-pa-criterion--room') or listing.find('div', text=lambda x: x and ('pièce' in x or 'T' in x))
+        rooms_elem = _SEL_ROOMS.select_one(listing) or listing.find('div', string=_ROOM_TEXT_RE)
         if rooms_elem:
             data['rooms'] = rooms_elem.get_text(strip=True)
         
         # Area
-        area_elem = listing.find('li', class_='c-pa-criterion--surface') or listing.find('div', text=lambda x: x and 'm²' in x)
+        area_elem = _SEL_AREA.select_one(listing) or listing.find('div', string=_AREA_TEXT_RE)
         if area_elem:
             data['area'] = area_elem.get_text(strip=True)
         
         # Location
-        location_elem = listing.find('div', class_='c-pa-city') or listing.find('span', class_='c-pa-list-city')
+        location_elem = _SEL_LOCATION.select_one(listing)
         if location_elem:
             location_text = location_elem.get_text(strip=True)
             data['address'] = location_text
             
             # Extract postal code if present
-            parts = location_text.split()
-            for part in parts:
-                if part.isdigit() and len(part) == 5:
-                    data['postal_code'] = part
-                    break
+            match = _POSTAL_RE.search(location_text)
+            if match:
+                data['postal_code'] = match.group(1)
         
         # Images
         img_elem = listing.find('img')
@@ -137,11 +189,9 @@ class SeLogerScraper(BaseScraper):
             data['id'] = listing['data-listing-id']
         elif data.get('url'):
             # Extract ID from URL
-            url_parts = data['url'].split('/')
-            for part in url_parts:
-                if part.isdigit():
-                    data['id'] = part
-                    break
+            match = _ID_RE.search(data['url'])
+            if match:
+                data['id'] = match.group(1)
         
         return data
     
@@ -155,49 +205,53 @@ class SeLogerScraper(BaseScraper):
             if not response:
                 return {}
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            details = {}
-            
-            # Description
-            desc_elem = soup.find('div', class_='c-pa-description') or soup.find('section', class_='description')
-            if desc_elem:
-                details['description'] = desc_elem.get_text(strip=True)
-            
-            # Detailed features
-            features = soup.find_all('li', class_='criterion-item') or soup.find_all('div', class_='c-pa-criterion')
-            feature_list = []
-            for feature in features:
-                feature_text = feature.get_text(strip=True)
-                if feature_text:
-                    feature_list.append(feature_text)
-            
-            if feature_list:
-                details['features_list'] = feature_list
-            
-            # Contact information
-            contact_info = self.extract_contact_info_from_page(soup)
-            if contact_info:
-                details['contact'] = contact_info
-            
-            # Additional images
-            img_gallery = soup.find('div', class_='c-pa-gallery') or soup.find('div', class_='slider-container')
-            if img_gallery:
-                images = []
-                for img in img_gallery.find_all('img'):
-                    if img.get('src'):
-                        images.append(img['src'])
-                    elif img.get('data-src'):  # Lazy loaded images
-                        images.append(img['data-src'])
-                
-                if images:
-                    details['images'] = images
-            
-            return details
+            return self._parse_property_details(response.content)
             
         except Exception as e:
-            logger.error(f"Error getting property details from {property_url}: {str(e)}")
+            logger.error("Error getting property details from %s: %s", property_url, e)
             return {}
     
+    def _parse_property_details(self, html: bytes) -> Dict[str, Any]:
+        """Parse a SeLoger property detail page"""
+        soup = self.parse_html(html)
+        details = {}
+            
+        # Description
+        desc_elem = _SEL_DESCRIPTION.select_one(soup)
+        if desc_elem:
+            details['description'] = desc_elem.get_text(strip=True)
+        
+        # Detailed features
+        features = _SEL_FEATURES.select(soup) or _SEL_FEATURES_ALT.select(soup)
+        feature_list = []
+        for feature in features:
+            feature_text = feature.get_text(strip=True)
+            if feature_text:
+                feature_list.append(feature_text)
+        
+        if feature_list:
+            details['features_list'] = feature_list
+        
+        # Contact information
+        contact_info = self.extract_contact_info_from_page(soup)
+        if contact_info:
+            details['contact'] = contact_info
+        
+        # Additional images
+        img_gallery = _SEL_GALLERY.select_one(soup)
+        if img_gallery:
+            images = []
+            for img in img_gallery.find_all('img'):
+                if img.get('src'):
+                    images.append(img['src'])
+                elif img.get('data-src'):  # Lazy loaded images
+                    images.append(img['data-src'])
+            
+            if images:
+                details['images'] = images
+        
+        return details
+    
     def extract_contact_info(self, property_data: Dict[str, Any]) -> Dict[str, str]:
         """Extract contact information from property data"""
         contact = property_data.get('contact', {})
@@ -214,26 +268,26 @@ class SeLogerScraper(BaseScraper):
         contact_info = {}
         
         # Agency name
-        agency_elem = soup.find('div', class_='c-pa-agency-name') or soup.find('span', class_='agency-name')
+        agency_elem = _SEL_AGENCY.select_one(soup)
         if agency_elem:
             contact_info['agency'] = agency_elem.get_text(strip=True)
         
         # Phone number (often hidden/protected)
-        phone_elem = soup.find('span', {'data-phone': True}) or soup.find('button', class_='phone-button')
+        phone_elem = _SEL_PHONE.select_one(soup)
         if phone_elem:
             phone = phone_elem.get('data-phone') or phone_elem.get_text(strip=True)
             if phone and phone != 'Voir le numéro':
                 contact_info['phone'] = phone
         
         # Email (usually requires interaction, look for contact forms)
-        email_form = soup.find('form', class_='contact-form') or soup.find('div', class_='contact-email')
+        email_form = _SEL_CONTACT_FORM.select_one(soup)
         if email_form:
             email_input = email_form.find('input', {'type': 'email'})
             if email_input and email_input.get('value'):
                 contact_info['email'] = email_input['value']
         
         # Agent name
-        agent_elem = soup.find('div', class_='agent-name') or soup.find('span', class_='c-pa-agent')
+        agent_elem = _SEL_AGENT.select_one(soup)
         if agent_elem:
             contact_info['agent'] = agent_elem.get_text(strip=True)
         
@@ -256,22 +310,22 @@ class SeLogerScraper(BaseScraper):
         # Property type check
         prop_type = property_data.get('property_type', '').lower()
         if prop_type and criteria.property_types:
-            if prop_type not in [pt.lower() for pt in criteria.property_types]:
+            if prop_type not in _lowered_set(criteria.property_types):
                 return False
         
-        # Keyword filtering
+        # Keyword filtering - each keyword set compiles to one regex
+        # alternation, so the text is scanned once per set instead of
+        # once per keyword
         text_content = f"{property_data.get('title', '')} {property_data.get('description', '')}".lower()
         
         # Exclude keywords check
-        if criteria.exclude_keywords:
-            for exclude_keyword in criteria.exclude_keywords:
-                if exclude_keyword.lower() in text_content:
-                    return False
+        exclude_re = _keyword_re(criteria.exclude_keywords)
+        if exclude_re and exclude_re.search(text_content):
+            return False
         
         # Include keywords check (at least one should match if specified)
-        if criteria.keywords:
-            keyword_match = any(keyword.lower() in text_content for keyword in criteria.keywords)
-            if not keyword_match:
-                return False
+        include_re = _keyword_re(criteria.keywords)
+        if include_re and not include_re.search(text_content):
+            return False
         
         return True
\ No newline at end of file
@@ -3,74 +3,213 @@ Duplicate detection utilities for rental properties
 """
 
 import logging
-from typing import Dict, Any, Optional, List
-from difflib import SequenceMatcher
-from fuzzywuzzy import fuzz
+from functools import lru_cache
+from itertools import count
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, List, Tuple
+from datasketch import MinHash, MinHashLSH
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Indel
 import re
 
 from config.settings import Config
-from database.models import Property, get_db
+from database.models import Property, get_db, session_scope
 
 logger = logging.getLogger(__name__)
 
+# Room descriptions ("studio", "T3", "2 pièces") matched in one C-level
+# regex scan instead of a substring test per mapping entry
+_ROOM_RE = re.compile(r'studio|[tf]([1-5])|([1-5])\s*pi[eè]ces?')
+_FIRST_DIGIT_RE = re.compile(r'\d')
+
+# Strips everything but digits and the decimal point in one C-level
+# substitution - same pattern the scrapers use for numeric extraction
+_NON_NUMERIC_RE = re.compile(r'[^\d.]+')
+
+# Normalization patterns, compiled once at import instead of inside
+# every _normalize_* call
+_NUM_RE = re.compile(r'\d+')
+_ADDR_CITY_RE = re.compile(r'\b(paris|lyon|marseille|france)\b')
+_POSTAL_CODE_RE = re.compile(r'\b\d{5}\b')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+
+# Street-type abbreviations applied as one alternation sub; word
+# boundaries keep 'rue' from matching inside e.g. 'verrue'
+_ADDR_ABBREVIATIONS = {
+    'rue': 'r',
+    'avenue': 'av',
+    'boulevard': 'bd',
+    'place': 'pl',
+    'square': 'sq',
+    'impasse': 'imp',
+    'passage': 'pass',
+    'allée': 'all',
+    'quai': 'q',
+}
+_ADDR_ABBREV_RE = re.compile(r'\b(' + '|'.join(
+    sorted(_ADDR_ABBREVIATIONS, key=len, reverse=True)) + r')\b')
+
+# Real estate jargon that doesn't help identify uniqueness, removed in
+# a single scan instead of one str.replace per word
+_JARGON_RE = re.compile(
+    r'\b(appartement|logement|location|louer|disponible'
+    r'|immédiatement|libre|contact|visite|dossier)\b')
+
 class DuplicateDetector:
-    """Detects duplicate rental properties across different sources"""
+    """Detects duplicate rental properties across different sources
+
+    Candidate lookup goes through an in-memory MinHash LSH index over
+    shingles of the normalized address and description. Querying the
+    index is roughly O(1) in the number of stored properties, so a
+    scrape run no longer pays a full fuzzy comparison pass per listing;
+    the expensive string similarity only runs on the handful of
+    candidates the index returns.
+    """
+    
+    # MinHash precision and shingle width for the LSH index
+    MINHASH_PERMUTATIONS = 128
+    SHINGLE_SIZE = 5
     
     def __init__(self, config: Config):
         self.config = config
         self.address_threshold = config.ADDRESS_SIMILARITY_THRESHOLD
         self.description_threshold = config.DESCRIPTION_SIMILARITY_THRESHOLD
         self.price_threshold = config.PRICE_DIFFERENCE_THRESHOLD
+        
+        # Address similarity is commutative, so results are cached by
+        # the sorted address pair - scrape passes keep re-comparing new
+        # listings against the same stored addresses
+        self._sim_cache: Dict[Tuple[str, str], float] = {}
+        
+        # Built lazily on first lookup so construction works before init_db
+        self._lsh: Optional[MinHashLSH] = None
+        self._indexed_ids: Dict[str, int] = {}  # LSH key -> property id
+        self._new_key_seq = count()
+        # Rows accepted this run, keyed like the LSH, so repeats within
+        # one scrape pass can be scored before anything hits the database
+        self._new_rows: Dict[str, SimpleNamespace] = {}
+    
+    def _index_text(self, address: str, description: str) -> str:
+        """Normalized text a property is indexed under"""
+        return (self._normalize_address(address or '') + ' ' +
+                self._normalize_description(description or '')).strip()
+    
+    def _shingle_minhash(self, text: str) -> MinHash:
+        """Build a MinHash from character shingles of normalized text"""
+        mh = MinHash(num_perm=self.MINHASH_PERMUTATIONS)
+        data = text.encode('utf-8')
+        for i in range(len(data) - self.SHINGLE_SIZE + 1):
+            mh.update(data[i:i + self.SHINGLE_SIZE])
+        return mh
+    
+    def _ensure_index(self):
+        """Populate the LSH index from existing properties on first use"""
+        if self._lsh is not None:
+            return
+        
+        self._lsh = MinHashLSH(threshold=self.address_threshold,
+                               num_perm=self.MINHASH_PERMUTATIONS)
+        with session_scope() as db:
+            rows = db.query(Property.id, Property.address, Property.description).filter(
+                Property.still_available == True
+            ).all()
+        
+        for prop_id, address, description in rows:
+            text = self._index_text(address, description)
+            if len(text) < self.SHINGLE_SIZE:
+                continue
+            key = f'db:{prop_id}'
+            self._lsh.insert(key, self._shingle_minhash(text))
+            self._indexed_ids[key] = prop_id
+        
+        logger.info("Duplicate index built over %d properties", len(self._indexed_ids))
     
     def is_duplicate(self, property_data: Dict[str, Any]) -> bool:
         """Check if a property is a duplicate of existing ones"""
         try:
-            db = get_db()
-            
-            # Get existing properties in the same city with similar price range
             price = self.parse_price(property_data.get('price', ''))
             city = property_data.get('city', '').strip().lower()
             
             if not price or not city:
                 return False
             
-            # Query properties within price range
-            price_min = price - self.price_threshold
-            price_max = price + self.price_threshold
+            self._ensure_index()
             
-            existing_properties = db.query(Property).filter(
-                Property.city.ilike(f'%{city}%'),
-                Property.price >= price_min,
-                Property.price <= price_max,
-                Property.still_available == True
-            ).all()
+            text = self._index_text(
+                property_data.get('address', ''),
+                property_data.get('description', '') or property_data.get('title', '')
+            )
+            if len(text) < self.SHINGLE_SIZE:
+                return False
+            
+            # LSH narrows the search to near-matching candidates; the
+            # full fuzzy comparison only runs on those. Candidates are
+            # either stored rows or rows accepted earlier in this run.
+            minhash = self._shingle_minhash(text)
+            keys = self._lsh.query(minhash)
+            candidate_ids = [self._indexed_ids[key] for key in keys
+                             if key in self._indexed_ids]
+            candidates = [self._new_rows[key] for key in keys
+                          if key in self._new_rows]
             
-            # Check each existing property for similarity
-            for existing in existing_properties:
-                if self._is_same_property(property_data, existing):
-                    logger.info(f"🔍 Found duplicate property: {property_data.get('url', 'Unknown')}")
-                    return True
+            if candidate_ids:
+                with session_scope() as db:
+                    candidates.extend(db.query(Property).filter(
+                        Property.id.in_(candidate_ids)
+                    ).all())
             
+            if candidates:
+                # Score every candidate address in one vectorized pass;
+                # the per-pair check reuses its row of the matrix
+                # instead of re-running the ratio in Python
+                addr_norm = self._normalize_address(property_data.get('address', ''))
+                candidate_norms = [self._normalize_address(existing.address or '')
+                                   for existing in candidates]
+                scores = process.cdist([addr_norm], candidate_norms,
+                                       scorer=fuzz.ratio, workers=-1)[0]
+                
+                for existing, address_ratio in zip(candidates, scores):
+                    if self._is_same_property(property_data, existing,
+                                              address_ratio=address_ratio):
+                        logger.info("🔍 Found duplicate property: %s", property_data.get('url', 'Unknown'))
+                        return True
+            
+            # Not a duplicate - index it, keeping enough of the row to
+            # score later listings of this run against it
+            key = f'new:{next(self._new_key_seq)}'
+            self._lsh.insert(key, minhash)
+            self._new_rows[key] = SimpleNamespace(
+                address=property_data.get('address', ''),
+                description=property_data.get('description', '') or property_data.get('title', ''),
+                title=property_data.get('title', ''),
+                price=price,
+                rooms=self.parse_rooms(property_data.get('rooms', '')),
+                area=self.parse_area(property_data.get('area', ''))
+            )
             return False
             
         except Exception as e:
-            logger.error(f"Error checking for duplicates: {str(e)}")
+            logger.error("Error checking for duplicates: %s", str(e))
             return False
-        finally:
-            if 'db' in locals():
-                db.close()
     
-    def _is_same_property(self, new_data: Dict[str, Any], existing: Property) -> bool:
-        """Compare two properties to determine if they're the same"""
+    def _is_same_property(self, new_data: Dict[str, Any], existing: Property,
+                          address_ratio: Optional[float] = None) -> bool:
+        """Compare two properties to determine if they're the same
+        
+        address_ratio optionally carries a 0-100 score from a batched
+        cdist pass, skipping the per-pair ratio computation.
+        """
         
         # 1. Address similarity
         address_similarity = self._calculate_address_similarity(
             new_data.get('address', ''),
-            existing.address or ''
+            existing.address or '',
+            ratio=address_ratio
         )
         
         if address_similarity > self.address_threshold:
-            logger.debug(f"High address similarity: {address_similarity:.2f}")
+            logger.debug("High address similarity: %.2f", address_similarity)
             return True
         
         # 2. Description similarity (if addresses are somewhat similar)
@@ -81,7 +220,7 @@ class DuplicateDetector:
             )
             
             if description_similarity > self.description_threshold:
-                logger.debug(f"High description similarity: {description_similarity:.2f}")
+                logger.debug("High description similarity: %.2f", description_similarity)
                 return True
         
         # 3. Exact room/area/price match with similar location
@@ -92,36 +231,61 @@ class DuplicateDetector:
         
         return False
     
-    def _calculate_address_similarity(self, address1: str, address2: str) -> float:
+    def _calculate_address_similarity(self, address1: str, address2: str,
+                                      ratio: Optional[float] = None) -> float:
         """Calculate similarity between two addresses"""
         if not address1 or not address2:
             return 0.0
         
+        key = (address1, address2) if address1 <= address2 else (address2, address1)
+        cached = self._sim_cache.get(key)
+        if cached is not None:
+            return cached
+        
         # Normalize addresses
         addr1_norm = self._normalize_address(address1)
         addr2_norm = self._normalize_address(address2)
         
-        # Use fuzzy string matching
-        similarity = fuzz.ratio(addr1_norm, addr2_norm) / 100.0
-        
-        # Boost similarity if key elements match
+        # Boost bonuses are cheap set operations, computed first so the
+        # ratio call can take a cutoff
+        bonus = 0.0
         addr1_parts = set(addr1_norm.split())
         addr2_parts = set(addr2_norm.split())
         
         # Check for street number matches
-        nums1 = set(re.findall(r'\d+', addr1_norm))
-        nums2 = set(re.findall(r'\d+', addr2_norm))
+        nums1 = set(_NUM_RE.findall(addr1_norm))
+        nums2 = set(_NUM_RE.findall(addr2_norm))
         
         if nums1 and nums2 and nums1.intersection(nums2):
-            similarity += 0.1  # Boost for matching street numbers
+            bonus += 0.1  # Boost for matching street numbers
         
         # Check for street name matches
         common_words = addr1_parts.intersection(addr2_parts)
         if common_words:
-            word_bonus = min(0.3, len(common_words) * 0.1)
-            similarity += word_bonus
-        
-        return min(1.0, similarity)
+            bonus += min(0.3, len(common_words) * 0.1)
+        
+        if ratio is not None:
+            similarity = ratio / 100.0
+        else:
+            # _is_same_property's lowest tier is 0.4, so any ratio that
+            # cannot reach it even with the bonus is interchangeable
+            # with zero - the cutoff lets rapidfuzz abandon the
+            # edit-distance computation early on clearly different
+            # addresses
+            cutoff = max(0.0, (0.4 - bonus) * 100)
+            # A ratio can never exceed 2*min_len/(len1+len2), so a large
+            # length gap proves the score falls under the cutoff without
+            # any edit-distance work
+            total_len = len(addr1_norm) + len(addr2_norm)
+            bound = 200.0 * min(len(addr1_norm), len(addr2_norm)) / total_len if total_len else 0.0
+            if bound < cutoff:
+                similarity = 0.0
+            else:
+                similarity = fuzz.ratio(addr1_norm, addr2_norm, score_cutoff=cutoff) / 100.0
+        
+        result = min(1.0, similarity + bonus)
+        self._sim_cache[key] = result
+        return result
     
     def _calculate_description_similarity(self, desc1: str, desc2: str) -> float:
         """Calculate similarity between two property descriptions"""
@@ -132,8 +296,27 @@ class DuplicateDetector:
         desc1_norm = self._normalize_description(desc1)
         desc2_norm = self._normalize_description(desc2)
         
-        # Use token sort ratio for better results with reordered text
-        similarity = fuzz.token_sort_ratio(desc1_norm, desc2_norm) / 100.0
+        # Same length bound as the address path: when even the maximal
+        # possible ratio misses the threshold, fail without comparing
+        total_len = len(desc1_norm) + len(desc2_norm)
+        if (not total_len or
+                2.0 * min(len(desc1_norm), len(desc2_norm)) / total_len < self.description_threshold):
+            return 0.0
+        
+        # Short strings gain nothing from token_sort_ratio's tokenize
+        # and sort step - the bit-parallel Indel similarity scores them
+        # directly. Longer descriptions keep token sorting so reordered
+        # sentences still match. Either way the result is only compared
+        # against description_threshold, so scores below it
+        # short-circuit to zero
+        if len(desc1_norm) < 64 and len(desc2_norm) < 64:
+            similarity = Indel.normalized_similarity(
+                desc1_norm, desc2_norm,
+                score_cutoff=self.description_threshold)
+        else:
+            similarity = fuzz.token_sort_ratio(
+                desc1_norm, desc2_norm,
+                score_cutoff=self.description_threshold * 100) / 100.0
         
         return similarity
     
@@ -165,7 +348,9 @@ class DuplicateDetector:
         
         return True
     
-    def _normalize_address(self, address: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _normalize_address(address: str) -> str:
         """Normalize address for comparison"""
         if not address:
             return ''
@@ -173,33 +358,23 @@ class DuplicateDetector:
         # Convert to lowercase and remove extra whitespace
         normalized = address.lower().strip()
         
-        # Replace common abbreviations
-        replacements = {
-            'rue': 'r',
-            'avenue': 'av',
-            'boulevard': 'bd',
-            'place': 'pl',
-            'square': 'sq',
-            'impasse': 'imp',
-            'passage': 'pass',
-            'allée': 'all',
-            'quai': 'q',
-        }
-        
-        for old, new in replacements.items():
-            normalized = normalized.replace(old, new)
+        # Replace common abbreviations in one alternation scan
+        normalized = _ADDR_ABBREV_RE.sub(
+            lambda match: _ADDR_ABBREVIATIONS[match.group(0)], normalized)
         
         # Remove common suffixes/prefixes
-        normalized = re.sub(r'\b(paris|lyon|marseille|france)\b', '', normalized)
-        normalized = re.sub(r'\b\d{5}\b', '', normalized)  # Remove postal codes
+        normalized = _ADDR_CITY_RE.sub('', normalized)
+        normalized = _POSTAL_CODE_RE.sub('', normalized)  # Remove postal codes
         
         # Remove extra whitespace and punctuation
-        normalized = re.sub(r'[^\w\s]', ' ', normalized)
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        normalized = _PUNCT_RE.sub(' ', normalized)
+        normalized = _WS_RE.sub(' ', normalized).strip()
         
         return normalized
     
-    def _normalize_description(self, description: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _normalize_description(description: str) -> str:
         """Normalize description for comparison"""
         if not description:
             return ''
@@ -207,18 +382,12 @@ class DuplicateDetector:
         # Convert to lowercase and remove extra whitespace
         normalized = description.lower().strip()
         
-        # Remove common real estate jargon that doesn't help identify uniqueness
-        jargon_to_remove = [
-            'appartement', 'logement', 'location', 'louer', 'disponible',
-            'immédiatement', 'libre', 'contact', 'visite', 'dossier'
-        ]
-        
-        for jargon in jargon_to_remove:
-            normalized = normalized.replace(jargon, ' ')
+        # Remove real estate jargon in one alternation scan
+        normalized = _JARGON_RE.sub(' ', normalized)
         
         # Remove extra whitespace and punctuation
-        normalized = re.sub(r'[^\w\s]', ' ', normalized)
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        normalized = _PUNCT_RE.sub(' ', normalized)
+        normalized = _WS_RE.sub(' ', normalized).strip()
         
         return normalized
     
@@ -227,10 +396,7 @@ class DuplicateDetector:
         if not price_text:
             return None
         
-        # Remove common currency symbols and text
-        price_clean = price_text.replace('€', '').replace('EUR', '').replace(' ', '')
-        price_clean = price_clean.replace(',', '.').replace('CC', '').replace('charges', '')
-        price_clean = ''.join(filter(lambda x: x.isdigit() or x == '.', price_clean))
+        price_clean = _NON_NUMERIC_RE.sub('', price_text.replace(',', '.'))
         
         try:
             return float(price_clean) if price_clean else None
@@ -242,9 +408,7 @@ class DuplicateDetector:
         if not area_text:
             return None
         
-        # Extract numbers followed by m² or m2
-        area_clean = area_text.replace('m²', '').replace('m2', '').replace(' ', '')
-        area_clean = ''.join(filter(lambda x: x.isdigit() or x == '.', area_clean))
+        area_clean = _NON_NUMERIC_RE.sub('', area_text)
         
         try:
             return float(area_clean) if area_clean else None
@@ -256,27 +420,14 @@ class DuplicateDetector:
         if not rooms_text:
             return None
         
-        # Common French room descriptions
-        room_mappings = {
-            'studio': 1,
-            'T1': 1, 'F1': 1, '1 pièce': 1,
-            'T2': 2, 'F2': 2, '2 pièces': 2,
-            'T3': 3, 'F3': 3, '3 pièces': 3,
-            'T4': 4, 'F4': 4, '4 pièces': 4,
-            'T5': 5, 'F5': 5, '5 pièces': 5,
-        }
-        
-        rooms_lower = rooms_text.lower()
-        for key, value in room_mappings.items():
-            if key.lower() in rooms_lower:
-                return value
-        
-        # Extract first number found
-        numbers = ''.join(filter(str.isdigit, rooms_text))
-        try:
-            return int(numbers[0]) if numbers else None
-        except (ValueError, IndexError):
-            return None
+        match = _ROOM_RE.search(rooms_text.lower())
+        if match:
+            digit = match.group(1) or match.group(2)
+            return int(digit) if digit else 1  # bare "studio" counts as 1
+        
+        # Fall back to the first digit found
+        match = _FIRST_DIGIT_RE.search(rooms_text)
+        return int(match.group()) if match else None
     
     def find_similar_properties(self, property_data: Dict[str, Any], limit: int = 5) -> List[Property]:
         """Find similar properties (not necessarily duplicates)"""
@@ -293,8 +444,10 @@ class DuplicateDetector:
             price_min = price - (self.price_threshold * 2)
             price_max = price + (self.price_threshold * 2)
             
+            # Equality on the normalized column rides the composite
+            # index; a leading-wildcard ILIKE never can
             similar_properties = db.query(Property).filter(
-                Property.city.ilike(f'%{city}%'),
+                Property.city_lc == city,
                 Property.price >= price_min,
                 Property.price <= price_max,
                 Property.still_available == True
@@ -303,7 +456,7 @@ class DuplicateDetector:
             return similar_properties
             
         except Exception as e:
-            logger.error(f"Error finding similar properties: {str(e)}")
+            logger.error("Error finding similar properties: %s", e)
             return []
         finally:
             if 'db' in locals():
@@ -2,24 +2,52 @@
 Logging configuration for French Real Estate Rental Hunter
 """
 
+import atexit
 import logging
 import logging.handlers
 import sys
 from pathlib import Path
 from datetime import datetime
+from queue import SimpleQueue
 
-from config.settings import Config
+from pythonjsonlogger import jsonlogger
+
+from config.settings import get_config
+
+# Background thread draining the log queue to the real handlers
+_queue_listener = None
+_atexit_registered = False
+
+def _stop_listener():
+    """Stop the active listener, tolerating repeated calls
+
+    QueueListener.stop() is not idempotent, so both the atexit hook
+    and re-running setup_logging() go through this guard.
+    """
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
 
 def setup_logging():
-    """Setup logging configuration"""
-    config = Config()
+    """Setup logging configuration
+
+    Emitting threads only enqueue records; a single QueueListener
+    thread does the formatting, locking and file writes, so log calls
+    on the hot scrape path cost a queue put instead of synchronous I/O
+    on every attached handler.
+    """
+    global _queue_listener, _atexit_registered
+    config = get_config()
     
     # Create logs directory if it doesn't exist
     config.LOGS_DIR.mkdir(exist_ok=True)
     
-    # Create formatters
-    detailed_formatter = logging.Formatter(
-        '%(asctime)s | %(levelname)8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
+    # Create formatters - the file sink is structured JSON, one record
+    # per line; level/name/module fields replace the split log files
+    # (filter at read time, e.g. jq 'select(.levelname == "ERROR")')
+    json_formatter = jsonlogger.JsonFormatter(
+        '%(asctime)s %(levelname)s %(name)s %(module)s %(funcName)s %(lineno)d %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
@@ -32,15 +60,15 @@ def setup_logging():
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, config.LOG_LEVEL))
     
-    # Remove existing handlers
+    # Remove existing handlers and any previous listener
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    _stop_listener()
     
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(simple_formatter)
-    root_logger.addHandler(console_handler)
     
     # File handler with rotation
     file_handler = logging.handlers.RotatingFileHandler(
@@ -50,50 +78,21 @@ def setup_logging():
         encoding='utf-8'
     )
     file_handler.setLevel(getattr(logging, config.LOG_LEVEL))
-    file_handler.setFormatter(detailed_formatter)
-    root_logger.addHandler(file_handler)
-    
-    # Error file handler (separate file for errors)
-    error_file = config.LOGS_DIR / 'errors.log'
-    error_handler = logging.handlers.RotatingFileHandler(
-        error_file,
-        maxBytes=config.LOG_MAX_SIZE,
-        backupCount=config.LOG_BACKUP_COUNT,
-        encoding='utf-8'
-    )
-    error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(detailed_formatter)
-    root_logger.addHandler(error_handler)
+    file_handler.setFormatter(json_formatter)
     
-    # Scraping-specific logger
-    scraping_file = config.LOGS_DIR / 'scraping.log'
-    scraping_handler = logging.handlers.RotatingFileHandler(
-        scraping_file,
-        maxBytes=config.LOG_MAX_SIZE,
-        backupCount=config.LOG_BACKUP_COUNT,
-        encoding='utf-8'
-    )
-    scraping_handler.setLevel(logging.DEBUG)
-    scraping_handler.setFormatter(detailed_formatter)
-    
-    # Add scraping handler to scrapers loggers
-    scraping_logger = logging.getLogger('scrapers')
-    scraping_logger.addHandler(scraping_handler)
-    
-    # Communication-specific logger
-    comm_file = config.LOGS_DIR / 'communication.log'
-    comm_handler = logging.handlers.RotatingFileHandler(
-        comm_file,
-        maxBytes=config.LOG_MAX_SIZE,
-        backupCount=config.LOG_BACKUP_COUNT,
-        encoding='utf-8'
+    # Everything hangs off the root logger through one queue; the
+    # listener fans records out to the real handlers off-thread
+    log_queue = SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue,
+        console_handler, file_handler,
+        respect_handler_level=True
     )
-    comm_handler.setLevel(logging.DEBUG)
-    comm_handler.setFormatter(detailed_formatter)
-    
-    # Add communication handler
-    comm_logger = logging.getLogger('communication')
-    comm_logger.addHandler(comm_handler)
+    _queue_listener.start()
+    if not _atexit_registered:
+        atexit.register(_stop_listener)
+        _atexit_registered = True
     
     # Suppress some noisy third-party loggers
     logging.getLogger('urllib3').setLevel(logging.WARNING)
@@ -102,5 +101,5 @@ def setup_logging():
     
     # Log startup message
     root_logger.info("🎯 Logging system initialized")
-    root_logger.info(f"📄 Log files: {config.LOGS_DIR}")
-    root_logger.info(f"🔍 Log level: {config.LOG_LEVEL}")
\ No newline at end of file
+    root_logger.info("📄 Log files: %s", config.LOGS_DIR)
+    root_logger.info("🔍 Log level: %s", config.LOG_LEVEL)
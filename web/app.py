@@ -3,21 +3,47 @@ Flask web application for French Real Estate Rental Hunter
 """
 
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, g, render_template, request, jsonify, redirect, url_for, flash
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import case, func
+from sqlalchemy.orm import load_only, selectinload
 
-from config.settings import Config
-from database.models import Property, Contact, Communication, ScrapingLog, PropertyStatus, get_db
+from config.settings import Config, get_config, validate_config
+from database.models import Property, Contact, Communication, ScrapingLog, PropertyStatus, ContactStatus, get_db
 from scrapers.seloger_scraper import SeLogerScraper
 
 logger = logging.getLogger(__name__)
 
+# Distinct-city dropdown data, refreshed at most once a minute - the
+# list changes only when a new city is scraped, so the full-table
+# DISTINCT scan has no place on the hot request path
+_CITIES_TTL_SECONDS = 60
+_cities_cache = {'ts': 0.0, 'data': []}
+
+# Manual scrapes run off the request thread - a scrape holds an HTTP
+# worker for minutes otherwise. Two workers cap concurrent manual runs.
+_scrape_executor = ThreadPoolExecutor(max_workers=2)
+_scrape_jobs: dict = {}
+
+def _available_cities(db_session):
+    """Cities for the properties filter, cached briefly in-process"""
+    now = time.time()
+    if now - _cities_cache['ts'] >= _CITIES_TTL_SECONDS:
+        _cities_cache['data'] = [
+            city for (city,) in db_session.query(Property.city.distinct()).all()
+        ]
+        _cities_cache['ts'] = now
+    return _cities_cache['data']
+
 def create_app(config: Config = None) -> Flask:
     """Create and configure Flask application"""
     
     if config is None:
-        config = Config()
+        config = get_config()
     
     app = Flask(__name__)
     app.config['SECRET_KEY'] = config.SECRET_KEY
@@ -28,22 +54,47 @@ def create_app(config: Config = None) -> Flask:
     db = SQLAlchemy()
     db.init_app(app)
     
+    # One session per request, shared via flask.g: routes no longer
+    # check a connection out of the pool per handler, and the identity
+    # map caches repeated lookups within a request
+    @app.before_request
+    def _open_session():
+        g.db = get_db()
+    
+    @app.teardown_request
+    def _close_session(exc):
+        db_session = g.pop('db', None)
+        if db_session is not None:
+            if exc is not None:
+                db_session.rollback()
+            db_session.close()
+    
     @app.route('/')
     def dashboard():
         """Main dashboard"""
         try:
-            db_session = get_db()
-            
-            # Get statistics
+            db_session = g.db
+            
+            # Get statistics - one conditional aggregate instead of four
+            # COUNT(*) round-trips over the same table
+            counts = db_session.query(
+                func.count().label('total'),
+                func.sum(case((Property.status == PropertyStatus.NEW, 1), else_=0)).label('new'),
+                func.sum(case((Property.status == PropertyStatus.CONTACTED, 1), else_=0)).label('contacted'),
+                func.sum(case((Property.status == PropertyStatus.RESPONDED, 1), else_=0)).label('responded'),
+            ).select_from(Property).one()
             stats = {
-                'total_properties': db_session.query(Property).count(),
-                'new_properties': db_session.query(Property).filter(Property.status == PropertyStatus.NEW).count(),
-                'contacted_properties': db_session.query(Property).filter(Property.status == PropertyStatus.CONTACTED).count(),
-                'responded_properties': db_session.query(Property).filter(Property.status == PropertyStatus.RESPONDED).count(),
+                'total_properties': counts.total,
+                'new_properties': int(counts.new or 0),
+                'contacted_properties': int(counts.contacted or 0),
+                'responded_properties': int(counts.responded or 0),
             }
             
-            # Get recent properties
-            recent_properties = db_session.query(Property).order_by(Property.first_seen.desc()).limit(10).all()
+            # Get recent properties - only the columns the card renders
+            recent_properties = db_session.query(Property).options(
+                load_only(Property.title, Property.price, Property.city,
+                          Property.source_site, Property.first_seen, Property._status)
+            ).order_by(Property.first_seen.desc()).limit(10).all()
             
             # Get recent scraping logs
             recent_logs = db_session.query(ScrapingLog).order_by(ScrapingLog.started_at.desc()).limit(5).all()
@@ -54,18 +105,15 @@ def create_app(config: Config = None) -> Flask:
                                  recent_logs=recent_logs)
             
         except Exception as e:
-            logger.error(f"Error loading dashboard: {str(e)}")
+            logger.error("Error loading dashboard: %s", e)
             flash('Error loading dashboard data', 'error')
             return render_template('dashboard.html', stats={}, recent_properties=[], recent_logs=[])
-        finally:
-            if 'db_session' in locals():
-                db_session.close()
     
     @app.route('/properties')
     def properties():
         """Properties listing page"""
         try:
-            db_session = get_db()
+            db_session = g.db
             
             # Get filters from request
             city_filter = request.args.get('city', '')
@@ -75,8 +123,15 @@ def create_app(config: Config = None) -> Flask:
             page = request.args.get('page', 1, type=int)
             per_page = 20
             
-            # Build query
-            query = db_session.query(Property)
+            # Build query - COUNT(*) OVER() rides along with the page
+            # rows, so pagination metadata costs no second scan
+            # load_only trims the row payload to what the listing shows;
+            # description and the JSON image blob stay in the database
+            query = db_session.query(Property, func.count().over().label('total')).options(
+                load_only(Property.title, Property.price, Property.rooms, Property.area,
+                          Property.city, Property.features, Property.source_site,
+                          Property.source_url, Property.first_seen, Property._status)
+            )
             
             if city_filter:
                 query = query.filter(Property.city.ilike(f'%{city_filter}%'))
@@ -95,13 +150,18 @@ def create_app(config: Config = None) -> Flask:
             
             # Paginate
             offset = (page - 1) * per_page
-            properties_list = query.offset(offset).limit(per_page).all()
+            rows = query.offset(offset).limit(per_page).all()
+            properties_list = [row[0] for row in rows]
             
-            # Get total count for pagination
-            total_count = query.count()
+            # Total comes from the window column; an out-of-range page
+            # returns no rows, so only then fall back to a count
+            if rows:
+                total_count = rows[0].total
+            else:
+                total_count = query.count() if page > 1 else 0
             
             # Get available cities for filter
-            available_cities = [city[0] for city in db_session.query(Property.city.distinct()).all()]
+            available_cities = _available_cities(db_session)
             
             return render_template('properties.html',
                                  properties=properties_list,
@@ -120,73 +180,63 @@ def create_app(config: Config = None) -> Flask:
                                  })
             
         except Exception as e:
-            logger.error(f"Error loading properties: {str(e)}")
+            logger.error("Error loading properties: %s", e)
             flash('Error loading properties', 'error')
             return render_template('properties.html', properties=[], cities=[], current_filters={}, pagination={})
-        finally:
-            if 'db_session' in locals():
-                db_session.close()
     
     @app.route('/property/<int:property_id>')
     def property_detail(property_id):
         """Property detail page"""
         try:
-            db_session = get_db()
-            
-            property_obj = db_session.query(Property).get(property_id)
+            db_session = g.db
+            
+            # Eager-load both relationships so the page costs one
+            # round-trip batch instead of three sequential queries
+            property_obj = db_session.query(Property).options(
+                selectinload(Property.contacts),
+                selectinload(Property.communications)
+            ).get(property_id)
             if not property_obj:
                 flash('Property not found', 'error')
                 return redirect(url_for('properties'))
             
-            # Get contacts for this property
-            contacts = db_session.query(Contact).filter(Contact.property_id == property_id).all()
-            
-            # Get communications for this property
-            communications = db_session.query(Communication).filter(Communication.property_id == property_id).order_by(Communication.sent_at.desc()).all()
-            
             return render_template('property_detail.html',
                                  property=property_obj,
-                                 contacts=contacts,
-                                 communications=communications)
+                                 contacts=property_obj.contacts,
+                                 communications=property_obj.communications)
             
         except Exception as e:
-            logger.error(f"Error loading property {property_id}: {str(e)}")
+            logger.error("Error loading property %s: %s", property_id, e)
             flash('Error loading property details', 'error')
             return redirect(url_for('properties'))
-        finally:
-            if 'db_session' in locals():
-                db_session.close()
     
     @app.route('/contacts')
     def contacts():
         """Contacts management page"""
         try:
-            db_session = get_db()
+            db_session = g.db
             
             # Get filters
             status_filter = request.args.get('status', '')
             
             query = db_session.query(Contact)
             if status_filter:
-                query = query.filter(Contact.status == status_filter)
+                query = query.filter(Contact.status == ContactStatus(status_filter))
             
             contacts_list = query.order_by(Contact.created_at.desc()).all()
             
             return render_template('contacts.html', contacts=contacts_list, current_status=status_filter)
             
         except Exception as e:
-            logger.error(f"Error loading contacts: {str(e)}")
+            logger.error("Error loading contacts: %s", e)
             flash('Error loading contacts', 'error')
             return render_template('contacts.html', contacts=[], current_status='')
-        finally:
-            if 'db_session' in locals():
-                db_session.close()
     
     @app.route('/scraping')
     def scraping():
         """Scraping logs and management"""
         try:
-            db_session = get_db()
+            db_session = g.db
             
             # Get recent scraping logs
             logs = db_session.query(ScrapingLog).order_by(ScrapingLog.started_at.desc()).limit(50).all()
@@ -194,12 +244,9 @@ def create_app(config: Config = None) -> Flask:
             return render_template('scraping.html', logs=logs)
             
         except Exception as e:
-            logger.error(f"Error loading scraping logs: {str(e)}")
+            logger.error("Error loading scraping logs: %s", e)
             flash('Error loading scraping data', 'error')
             return render_template('scraping.html', logs=[])
-        finally:
-            if 'db_session' in locals():
-                db_session.close()
     
     @app.route('/api/scrape', methods=['POST'])
     def api_scrape():
@@ -209,17 +256,29 @@ def create_app(config: Config = None) -> Flask:
             city = data.get('city', 'Paris')
             site = data.get('site', 'seloger')
             
-            # Start scraping task (this would typically be done in background)
+            # Submit the scrape to the background pool and return a job
+            # id immediately; /api/scrape/<job_id> reports progress
             if site == 'seloger':
                 scraper = SeLogerScraper(config)
-                # This is a simplified version - in production, use Celery or similar
-                properties = scraper.scrape_city(city, config.DEFAULT_SEARCH_CRITERIA)
+                
+                def _run_scrape():
+                    properties = scraper.scrape_city(city, config.DEFAULT_SEARCH_CRITERIA)
+                    scraper.save_properties(properties)
+                    return len(properties)
+                
+                # Drop finished jobs whose result nobody collected, so
+                # abandoned polls don't accumulate futures forever
+                for stale_id in [jid for jid, f in _scrape_jobs.items() if f.done()]:
+                    _scrape_jobs.pop(stale_id, None)
+                
+                job_id = uuid4().hex
+                _scrape_jobs[job_id] = _scrape_executor.submit(_run_scrape)
                 
                 return jsonify({
                     'success': True,
-                    'message': f'Found {len(properties)} properties in {city}',
-                    'properties_count': len(properties)
-                })
+                    'message': f'Scraping {city} started',
+                    'job_id': job_id
+                }), 202
             else:
                 return jsonify({
                     'success': False,
@@ -227,17 +286,43 @@ def create_app(config: Config = None) -> Flask:
                 }), 400
                 
         except Exception as e:
-            logger.error(f"Error in manual scraping: {str(e)}")
+            logger.error("Error in manual scraping: %s", e)
             return jsonify({
                 'success': False,
                 'message': f'Scraping failed: {str(e)}'
             }), 500
     
+    @app.route('/api/scrape/<job_id>')
+    def api_scrape_status(job_id):
+        """Poll the status of a background scraping job"""
+        future = _scrape_jobs.get(job_id)
+        if future is None:
+            return jsonify({'success': False, 'message': 'Unknown job'}), 404
+        
+        if not future.done():
+            return jsonify({'success': True, 'status': 'running'})
+        
+        # A final status is delivered once; the job is forgotten after
+        _scrape_jobs.pop(job_id, None)
+        try:
+            count = future.result()
+            return jsonify({
+                'success': True,
+                'status': 'completed',
+                'properties_count': count
+            })
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'status': 'failed',
+                'message': str(e)
+            })
+    
     @app.route('/api/property/<int:property_id>/status', methods=['POST'])
     def api_update_property_status(property_id):
         """API endpoint to update property status"""
         try:
-            db_session = get_db()
+            db_session = g.db
             
             data = request.get_json()
             new_status = data.get('status')
@@ -261,21 +346,17 @@ def create_app(config: Config = None) -> Flask:
             })
             
         except Exception as e:
-            logger.error(f"Error updating property status: {str(e)}")
-            if 'db_session' in locals():
-                db_session.rollback()
+            logger.error("Error updating property status: %s", e)
+            db_session.rollback()
             return jsonify({
                 'success': False,
                 'message': f'Failed to update status: {str(e)}'
             }), 500
-        finally:
-            if 'db_session' in locals():
-                db_session.close()
     
     @app.route('/settings')
     def settings():
         """Settings page"""
-        config_status = config.validate_config()
+        config_status = validate_config()
         return render_template('settings.html', config_status=config_status, config=config)
     
     @app.errorhandler(404)